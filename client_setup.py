@@ -7,7 +7,6 @@ import sys
 import subprocess
 import urllib.request
 import zipfile
-from pathlib import Path
 
 def check_python_version():
     """Check if Python version is sufficient."""
@@ -33,10 +32,9 @@ def setup_virtual_environment():
 
 def install_dependencies(pip_path, python_path):
     """Install required packages."""
-    print("\nInstalling dependencies...")
+    # spaCy is listed in requirements.txt, so one resolver pass covers it
+    print("\nInstalling dependencies (including spaCy)...")
     subprocess.run([pip_path, "install", "-r", "requirements.txt"])
-    print("\nInstalling spaCy...")
-    subprocess.run([pip_path, "install", "spacy"])
     print("Installing spaCy model...")
     subprocess.run([python_path, "-m", "spacy", "download", "en_core_web_sm"])
 
@@ -54,8 +52,12 @@ def setup_env_file():
 
 def check_database():
     """Check if the Chroma database exists."""
-    db_path = Path("embeddings/chromadb_vectors")
-    if db_path.exists() and any(db_path.iterdir()):
+    db_path = "embeddings/chromadb_vectors"
+    has_entries = False
+    if os.path.isdir(db_path):
+        with os.scandir(db_path) as entries:
+            has_entries = next(entries, None) is not None
+    if has_entries:
         print("✓ Chroma database found")
         return True
     else:
@@ -0,0 +1,49 @@
+"""
+Shared spaCy model for the chunkers in the Shakespeare AI project.
+
+The model is loaded lazily on first use and shared by every chunker in the
+process, so importing a chunker does not pay the model load and the model is
+only held in memory once.
+"""
+import importlib.util
+from functools import lru_cache
+from typing import Any, List, Tuple
+
+SPACY_AVAILABLE = importlib.util.find_spec("spacy") is not None
+
+# The fragment chunker needs the parser (token.subtree); the line and phrase
+# chunkers only need tokens and POS tags, so they pass this as `disable=`
+# when calling the shared model.
+DISABLE_PARSER = ["parser"]
+
+
+@lru_cache(maxsize=1)
+def get_nlp():
+    """Load en_core_web_sm on first use; returns None if the model is not installed."""
+    import spacy
+    try:
+        # tagger + attribute_ruler provide token.pos_, parser provides token.subtree
+        return spacy.load("en_core_web_sm", exclude=["senter", "ner", "lemmatizer"])
+    except OSError:
+        return None
+
+
+def word_positions(doc: Any) -> List[int]:
+    """Indices of the tokens in `doc` that are neither punctuation nor whitespace.
+
+    Reads the flags for the whole doc with one Doc.to_array call instead of
+    checking token.is_punct / token.is_space one token at a time.
+    """
+    from spacy.attrs import IS_PUNCT, IS_SPACE
+    return (~doc.to_array([IS_PUNCT, IS_SPACE]).any(axis=1)).nonzero()[0].tolist()
+
+
+def words_and_pos(doc: Any) -> Tuple[List[str], List[str]]:
+    """Texts and POS tags of the non-punctuation, non-whitespace tokens in `doc`."""
+    from spacy.attrs import IS_PUNCT, IS_SPACE, POS
+    arr = doc.to_array([IS_PUNCT, IS_SPACE, POS])
+    keep = (arr[:, 0] == 0) & (arr[:, 1] == 0)
+    strings = doc.vocab.strings
+    words = [doc[i].text for i in keep.nonzero()[0].tolist()]
+    pos_tags = [strings[p] for p in arr[keep, 2].tolist()]
+    return words, pos_tags
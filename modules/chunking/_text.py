@@ -0,0 +1,110 @@
+"""
+Shared text helpers for the chunkers in the Shakespeare AI project.
+
+These are pure functions called for every word or line of the corpus, so
+they live at module level (no bound-method lookup) and are memoized where
+the input vocabulary is small.
+"""
+import re
+from functools import lru_cache
+from typing import List
+
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Fallback word tokenizer used when spaCy is unavailable
+WORD_RE = re.compile(r"\b\w[\w']*\b")
+
+_VOWEL_RE = re.compile(r'[aeiouy]+')
+
+# Curly quotes/apostrophes -> plain ASCII, applied in one str.translate pass
+_QUOTE_TABLE = str.maketrans({
+    "\u2018": "'",
+    "\u2019": "'",
+    "\u201C": '"',
+    "\u201D": '"',
+})
+
+
+def normalize_quotes(line: str) -> str:
+    """Replace curly quotes/apostrophes with plain ASCII."""
+    return line.translate(_QUOTE_TABLE)
+
+
+@lru_cache(maxsize=1 << 16)
+def count_syllables(word: str) -> int:
+    """Estimate syllables in a word; memoized since the vocabulary is small."""
+    # Skip if it's punctuation or doesn't contain at least one letter
+    if not any(c.isalpha() for c in word):
+        return 0
+
+    word = word.lower()
+    if len(word) <= 3:
+        return 1
+    if word.endswith('e'):
+        word = word[:-1]
+    vowels = _VOWEL_RE.findall(word)
+    return max(1, len(vowels))
+
+
+def _count_syllable_runs(buf, out) -> None:
+    """Count syllables for each space-separated word in a lowercased ASCII buffer.
+
+    Mirrors count_syllables (no letters -> 0, <= 3 chars -> 1,
+    silent trailing 'e', vowel groups otherwise) as a byte-level state machine
+    writing one count per word into `out`.
+    """
+    n = len(buf)
+    word = 0
+    start = 0
+    for end in range(n + 1):
+        if end < n and buf[end] != 32:
+            continue
+        has_alpha = False
+        for k in range(start, end):
+            if 97 <= buf[k] <= 122:
+                has_alpha = True
+                break
+        if not has_alpha:
+            count = 0
+        elif end - start <= 3:
+            count = 1
+        else:
+            stop = end - 1 if buf[end - 1] == 101 else end
+            count = 0
+            in_vowel = False
+            for k in range(start, stop):
+                c = buf[k]
+                is_vowel = c == 97 or c == 101 or c == 105 or c == 111 or c == 117 or c == 121
+                if is_vowel and not in_vowel:
+                    count += 1
+                in_vowel = is_vowel
+            if count < 1:
+                count = 1
+        out[word] = count
+        word += 1
+        start = end + 1
+
+
+if NUMBA_AVAILABLE:
+    _count_syllable_runs = njit(cache=True)(_count_syllable_runs)
+
+
+def line_syllables(words: List[str]) -> List[int]:
+    """Count syllables for every word of a line.
+
+    Uses the Numba kernel for all-ASCII lines when numba is installed (one
+    native call per line) and the memoized count_syllables otherwise.
+    """
+    if NUMBA_AVAILABLE and words:
+        joined = " ".join(words).lower()
+        # The kernel splits on spaces and only knows ASCII letters
+        if joined.isascii() and joined.count(" ") == len(words) - 1:
+            out = np.empty(len(words), dtype=np.int32)
+            _count_syllable_runs(np.frombuffer(joined.encode("ascii"), dtype=np.uint8), out)
+            return out.tolist()
+    return list(map(count_syllables, words))
@@ -9,6 +9,22 @@ import json
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional, Union
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Write buffer for chunk output files; fewer, larger writes to disk
+_WRITE_BUFFER_SIZE = 1 << 20
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
 
 class ChunkBase(ABC):
     """Base class for all text chunkers in the Shakespeare AI project.
@@ -80,6 +96,13 @@ class ChunkBase(ABC):
         self.chunks = raw_chunks
         return raw_chunks
     
+    @staticmethod
+    def _ensure_output_dir(output_path: str) -> None:
+        """Create the parent directory of output_path unless it already exists."""
+        output_dir = os.path.dirname(output_path)
+        if output_dir and not os.path.isdir(output_dir):
+            os.makedirs(output_dir, exist_ok=True)
+
     def save_chunks(self, output_path: str) -> None:
         """Save processed chunks to a JSON file.
         
@@ -93,15 +116,40 @@ class ChunkBase(ABC):
             raise ValueError("No chunks to save. Process a text first.")
         
         # Ensure directory exists
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        self._ensure_output_dir(output_path)
         
-        # Save chunks to JSON
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump({
-                'chunk_type': self.chunk_type,
-                'chunks': self.chunks,
-                'total_chunks': len(self.chunks)
-            }, f, indent=2)
+        # Stream chunks to JSON one at a time rather than serializing the
+        # whole list into a single string
+        with open(output_path, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+            f.write(b'{"chunk_type": ')
+            f.write(_dumps(self.chunk_type))
+            f.write(b', "chunks": [')
+            for i, chunk in enumerate(self.chunks):
+                if i:
+                    f.write(b', ')
+                f.write(_dumps(chunk))
+            f.write(b'], "total_chunks": ')
+            f.write(str(len(self.chunks)).encode('ascii'))
+            f.write(b'}')
+
+    def save_chunks_ndjson(self, output_path: str) -> None:
+        """Save processed chunks as newline-delimited JSON (one chunk per line).
+
+        Args:
+            output_path (str): Path where the NDJSON file will be saved
+
+        Raises:
+            ValueError: If no chunks have been processed
+        """
+        if not self.chunks:
+            raise ValueError("No chunks to save. Process a text first.")
+
+        self._ensure_output_dir(output_path)
+
+        with open(output_path, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+            for chunk in self.chunks:
+                f.write(_dumps(chunk))
+                f.write(b'\n')
     
     def get_chunk_by_index(self, index: int) -> Optional[Dict[str, Any]]:
         """Retrieve a specific chunk by its index.
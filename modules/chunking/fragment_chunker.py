@@ -4,20 +4,42 @@ Fragment chunker module for Shakespeare AI project.
 This module provides functionality to chunk Shakespeare's text into small
 fragments (3-8 words) based on semantic groupings, preserving metadata.
 """
-import re
-from typing import List, Dict, Any, Optional
+import sys
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, groupby
+from operator import itemgetter
+from array import array
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 from .base import ChunkBase
+from ._spacy import SPACY_AVAILABLE, get_nlp, word_positions
+from ._text import WORD_RE, count_syllables, line_syllables, normalize_quotes
 from modules.utils.logger import CustomLogger
 
-try:
-    import spacy
-    try:
-        nlp = spacy.load("en_core_web_sm")
-        SPACY_AVAILABLE = True
-    except OSError:
-        SPACY_AVAILABLE = False
-except ImportError:
-    SPACY_AVAILABLE = False
+def _intern(value: Any) -> Any:
+    """Intern low-cardinality string fields so chunks share one object per value."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _bounded_subtree(token: Any, is_word: List[bool], lo: int, hi: int) -> Optional[List[Any]]:
+    """Collect the word tokens of a token's subtree.
+
+    Stops walking as soon as more than `hi` words are seen, and returns None
+    when the word count falls outside [lo, hi].
+    """
+    words = []
+    for t in token.subtree:
+        if is_word[t.i]:
+            words.append(t)
+            if len(words) > hi:
+                return None
+    return words if len(words) >= lo else None
+
+
+@lru_cache(maxsize=20000)
+def _parse(text: str):
+    """Parse a line with the shared model, reusing the Doc for repeated lines."""
+    return get_nlp()(text)
 
 
 class FragmentChunker(ChunkBase):
@@ -27,13 +49,20 @@ class FragmentChunker(ChunkBase):
     preserving references to the parent line and avoiding overlap.
     """
 
-    def __init__(self, min_words: int = 3, max_words: int = 8, logger: Optional[CustomLogger] = None):
+    def __init__(self, min_words: int = 3, max_words: int = 8, logger: Optional[CustomLogger] = None,
+                 batch_size: int = 256, n_process: int = 1, n_jobs: int = 1, shard_size: int = 500):
         super().__init__(chunk_type='fragment')
         self.logger = logger or CustomLogger("FragmentChunker")
         self.logger.info("Initializing FragmentChunker")
 
         self.min_words = min_words
         self.max_words = max_words
+        # Settings for nlp.pipe when parsing line chunks in bulk
+        self.batch_size = batch_size
+        self.n_process = n_process
+        # Worker processes for sharded fragmenting (1 = run in-process)
+        self.n_jobs = n_jobs
+        self.shard_size = shard_size
         self.logger.debug(f"Set word limits: min={min_words}, max={max_words}")
 
         if not SPACY_AVAILABLE:
@@ -42,190 +71,322 @@ class FragmentChunker(ChunkBase):
 
     def _normalize_quotes(self, line: str) -> str:
         """Replace curly quotes/apostrophes with plain ASCII."""
-        replacements = {
-            "\u2018": "'",
-            "\u2019": "'",
-            "\u201C": '"',
-            "\u201D": '"',
-        }
-        for old, new in replacements.items():
-            line = line.replace(old, new)
-        return line
+        return normalize_quotes(line)
 
     def _count_syllables(self, word: str) -> int:
-        # Skip if it's punctuation or doesn't contain at least one letter
-        if not any(c.isalpha() for c in word):
-            return 0
-
-        word = word.lower()
-        if len(word) <= 3:
-            return 1
-        if word.endswith('e'):
-            word = word[:-1]
-        vowels = re.findall(r'[aeiouy]+', word)
-        return max(1, len(vowels))
-
-    def _process_line_with_spacy(self, line: str) -> List[Any]:
-        """Process a line with spaCy, excluding punctuation and whitespace."""
-        if not SPACY_AVAILABLE:
-            words = re.findall(r"\b\w[\w']*\b", line)
+        return count_syllables(word)
+
+    def _line_syllables(self, words: List[str]) -> List[int]:
+        """Count syllables for every word of a line."""
+        return line_syllables(words)
+
+    def _process_line_with_spacy(self, line: str, doc: Any = None) -> List[Any]:
+        """Process a line with spaCy, excluding punctuation and whitespace.
+
+        Pass `doc` when the (normalized) line has already been parsed to skip
+        normalizing and parsing it again.
+        """
+        if doc is None and not SPACY_AVAILABLE:
+            words = WORD_RE.findall(line)
             return words
         
         try:
-            # Normalize quotes first
-            line = self._normalize_quotes(line)
-            
-            doc = nlp(line)
+            if doc is None:
+                # Normalize quotes first
+                line = self._normalize_quotes(line)
+
+                if get_nlp() is None:
+                    return WORD_RE.findall(line)
+
+                doc = _parse(line)
             # Filter out punctuation and whitespace
             tokens = [token for token in doc if not token.is_punct and not token.is_space]
             return tokens
         except Exception as e:
             self.logger.error(f"spaCy error: {e}")
-            words = re.findall(r"\b\w[\w']*\b", line)
+            words = WORD_RE.findall(line)
             return words
 
+    def _fragment_line(self, line_text: str, line_doc: Any) -> List[Tuple[str, int, int, int, List[str]]]:
+        """Split one line into non-overlapping fragments.
+
+        Returns:
+            List of (text, word_index_start, word_index_end, syllables, POS) tuples
+            in emission order.
+        """
+        fragments = []
+        debug = self.logger.is_debug_enabled()
+
+        # Get tokens without punctuation and whitespace
+        if SPACY_AVAILABLE and line_doc:
+            positions = word_positions(line_doc)
+            is_word = [False] * len(line_doc)
+            for i in positions:
+                is_word[i] = True
+
+            line_tokens = [line_doc[i] for i in positions]
+            token_words = [token.text for token in line_tokens]
+            pos_tags = [sys.intern(token.pos_) for token in line_tokens]
+            word_idx_of = dict(zip(positions, range(len(positions))))
+        else:
+            # Fallback tokenization
+            token_words = WORD_RE.findall(line_text)
+            line_tokens = token_words
+            pos_tags = [""] * len(token_words)
+
+        # Syllable count per word, summed over each fragment's span below
+        syll = self._line_syllables(token_words)
+
+        # Bitmask of word indices already covered by a fragment (bit k = word k)
+        used_mask = 0
+
+        # --- Primary Strategy: Use spaCy subtrees ---
+        if SPACY_AVAILABLE and line_doc:
+            for token in line_doc:
+                word_tokens = _bounded_subtree(token, is_word, self.min_words, self.max_words)
+                if word_tokens is None:
+                    continue
+
+                # Map the subtree's doc positions straight onto word indices
+                word_index_start = word_idx_of[word_tokens[0].i]
+                word_index_end = word_idx_of[word_tokens[-1].i]
+                if word_index_end - word_index_start + 1 != len(word_tokens):
+                    continue  # Subtree is not contiguous in the word sequence
+                span_mask = ((1 << len(word_tokens)) - 1) << word_index_start
+                if used_mask & span_mask:
+                    continue  # Overlaps an existing fragment
+
+                word_texts = [t.text for t in word_tokens]
+
+                fragment_text = " ".join(word_texts).strip()
+                fragment_pos = pos_tags[word_index_start:word_index_end + 1]
+                total_syllables = sum(syll[word_index_start:word_index_end + 1])
+
+                if debug:
+                    self.logger.debug(f"[SUBTREE] Fragment {len(fragments)}: '{fragment_text}' [words: {word_index_start}-{word_index_end}]")
+
+                fragments.append((fragment_text, word_index_start, word_index_end, total_syllables, fragment_pos))
+                used_mask |= span_mask
+
+        # --- Fallback Strategy: Sliding window with no overlap ---
+        if not fragments:
+            i = 0
+            while i <= len(line_tokens) - self.min_words:
+                for window_size in range(self.max_words, self.min_words - 1, -1):
+                    end = i + window_size
+                    if end > len(line_tokens):
+                        continue
+
+                    span_mask = ((1 << window_size) - 1) << i
+                    if used_mask & span_mask:
+                        continue
+
+                    window_tokens = line_tokens[i:end]
+                    if SPACY_AVAILABLE and all(hasattr(t, 'text') for t in window_tokens):
+                        fragment_words = [t.text for t in window_tokens]
+                        fragment_pos = pos_tags[i:end]
+                    else:
+                        fragment_words = window_tokens
+                        fragment_pos = pos_tags[i:end] if i + window_size <= len(pos_tags) else [""] * len(window_tokens)
+
+                    fragment_text = " ".join(fragment_words).strip()
+                    total_syllables = sum(syll[i:end])
+
+                    if debug:
+                        self.logger.debug(f"[FALLBACK] Fragment {len(fragments)}: '{fragment_text}' [words: {i}-{end - 1}]")
+
+                    fragments.append((fragment_text, i, end - 1, total_syllables, fragment_pos))
+                    used_mask |= span_mask
+                    break  # break after first valid window at position i
+                i += 1
+
+        return fragments
+
+    def _fragment_texts(self, texts: List[str]) -> Iterator[List[Tuple[str, int, int, int, List[str]]]]:
+        """Yield the fragments of each normalized line, parsing all lines in one spaCy stream."""
+        # Short lines ("Ay.", "No.", etc.) repeat often, so each distinct text
+        # is parsed and fragmented once and the result reused for duplicates
+        unique_texts = list(dict.fromkeys(texts))
+        nlp = get_nlp() if SPACY_AVAILABLE else None
+        if nlp is not None and len(unique_texts) == 1:
+            # Single-line calls (e.g. search queries) share the _parse cache
+            # with _process_line_with_spacy, so a line is never parsed twice
+            docs = [_parse(unique_texts[0])]
+        elif nlp is not None:
+            docs = nlp.pipe(unique_texts, batch_size=self.batch_size, n_process=self.n_process)
+        else:
+            docs = (None for _ in unique_texts)
+
+        fragments_by_text = {
+            line_text: self._fragment_line(line_text, line_doc)
+            for line_text, line_doc in zip(unique_texts, docs)
+        }
+        for line_text in texts:
+            yield fragments_by_text[line_text]
+
+    def _iter_line_fragments(self, line_chunks: List[Dict[str, Any]]):
+        """Yield (line_chunk, fragments) pairs, optionally sharded across worker processes."""
+        # Force max_words to 6
+        self.max_words = 6
+
+        # Normalize all line texts up front so spaCy can parse them in batches
+        texts = [normalize_quotes(lc['text']) for lc in line_chunks]
+
+        if self.n_jobs <= 1 or len(texts) <= self.shard_size:
+            yield from zip(line_chunks, self._fragment_texts(texts))
+            return
+
+        # Lines are independent, so each shard is parsed and fragmented in its own process
+        shards = [texts[i:i + self.shard_size] for i in range(0, len(texts), self.shard_size)]
+        self.logger.info(f"Fragmenting {len(shards)} shards across {self.n_jobs} processes")
+        with ProcessPoolExecutor(
+            max_workers=self.n_jobs,
+            initializer=_init_shard_worker,
+            initargs=(self.min_words, self.max_words, self.batch_size),
+        ) as executor:
+            shard_results = executor.map(_fragment_shard, shards)
+            yield from zip(line_chunks, chain.from_iterable(shard_results))
+
     def chunk_from_line_chunks(self, line_chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         self.logger.info("Starting fragment chunking from line chunks")
         self.logger.debug(f"Processing {len(line_chunks)} line chunks")
         chunks = []
 
-        # Force max_words to 6
-        self.max_words = 6
-
-        for line_chunk in line_chunks:
-            line_text = line_chunk['text']
+        for line_chunk, fragments in self._iter_line_fragments(line_chunks):
             line_id = line_chunk['chunk_id']
             source_chunk_id = line_chunk['chunk_id']  # Store original chunk_id
-            
-            # Normalize the text
-            line_text = self._normalize_quotes(line_text)
-
-            # Process the full line with spaCy
-            line_doc = nlp(line_text) if SPACY_AVAILABLE else None
-            
-            # Get tokens without punctuation and whitespace
-            if SPACY_AVAILABLE and line_doc:
-                line_tokens = [token for token in line_doc if not token.is_space and not token.is_punct]
-                token_words = [token.text for token in line_tokens]
-                pos_tags = [token.pos_ for token in line_tokens]
-            else:
-                # Fallback tokenization
-                token_words = re.findall(r"\b\w[\w']*\b", line_text)
-                line_tokens = token_words
-                pos_tags = [""] * len(token_words)
-
-            used_indices = set()
-            fragment_idx = 0
-
-            # --- Primary Strategy: Use spaCy subtrees ---
-            if SPACY_AVAILABLE and line_doc:
-                for token in line_doc:
-                    subtree_tokens = list(token.subtree)
-                    word_tokens = [t for t in subtree_tokens if not t.is_space and not t.is_punct]
-                    if len(word_tokens) < self.min_words or len(word_tokens) > self.max_words:
-                        continue
+            # Fields shared by every fragment of this line
+            title = _intern(line_chunk.get("title", "Unknown"))
+            line = line_chunk.get("line")
+            act = _intern(line_chunk.get("act"))
+            scene = _intern(line_chunk.get("scene"))
+            mood = _intern(line_chunk.get("mood", "neutral"))
 
-                    word_texts = [t.text for t in word_tokens]
-                    try:
-                        for i in range(len(token_words) - len(word_texts) + 1):
-                            if token_words[i:i+len(word_texts)] == word_texts:
-                                word_index_start = i
-                                word_index_end = i + len(word_texts) - 1
-                                if any(idx in used_indices for idx in range(word_index_start, word_index_end + 1)):
-                                    raise ValueError("Overlapping fragment indices")
-                                break
-                        else:
-                            raise ValueError("Fragment words not aligned")
-                    except ValueError:
-                        continue
+            for fragment_idx, (fragment_text, start, end, total_syllables, fragment_pos) in enumerate(fragments):
+                # Create chunk with consistent order as line_chunker.py
+                chunk = {
+                    "chunk_id": f"fragment_{line_id}_{fragment_idx}",
+                    "source_chunk_id": source_chunk_id,  # Added reference to source line
+                    "title": title,
+                    "line": line,
+                    "act": act,
+                    "scene": scene,
+                    "text": fragment_text,
+                    "word_index": f"{start},{end}",
+                    "syllables": total_syllables,
+                    "POS": fragment_pos,
+                    "mood": mood,
+                    "word_count": end - start + 1,
+                    "fragment_position": fragment_idx,
+                    "total_fragments_in_line": None  # Will update this later
+                }
+                chunks.append(chunk)
 
-                    fragment_text = " ".join(word_texts).strip()
-                    fragment_pos = [t.pos_ for t in word_tokens]
-                    total_syllables = sum(self._count_syllables(str(t.text)) for t in word_tokens)
-
-                    self.logger.debug(f"[SUBTREE] Fragment {fragment_idx}: '{fragment_text}' [words: {word_index_start}-{word_index_end}]")
-
-                    # Create chunk with consistent order as line_chunker.py
-                    chunk = {
-                        "chunk_id": f"fragment_{line_id}_{fragment_idx}",
-                        "source_chunk_id": source_chunk_id,  # Added reference to source line
-                        "title": line_chunk.get("title", "Unknown"),
-                        "line": line_chunk.get("line"),
-                        "act": line_chunk.get("act"),
-                        "scene": line_chunk.get("scene"),
-                        "text": fragment_text,
-                        "word_index": f"{word_index_start},{word_index_end}",
-                        "syllables": total_syllables,
-                        "POS": fragment_pos,
-                        "mood": line_chunk.get("mood", "neutral"),
-                        "word_count": len(word_tokens),
-                        "fragment_position": fragment_idx,
-                        "total_fragments_in_line": None  # Will update this later
-                    }
-                    chunks.append(chunk)
-                    used_indices.update(range(word_index_start, word_index_end + 1))
-                    fragment_idx += 1
-
-            # --- Fallback Strategy: Sliding window with no overlap ---
-            if fragment_idx == 0:
-                i = 0
-                while i <= len(line_tokens) - self.min_words:
-                    for window_size in range(self.max_words, self.min_words - 1, -1):
-                        end = i + window_size
-                        if end > len(line_tokens):
-                            continue
-
-                        if any(idx in used_indices for idx in range(i, end)):
-                            continue
-
-                        window_tokens = line_tokens[i:end]
-                        if SPACY_AVAILABLE and all(hasattr(t, 'text') for t in window_tokens):
-                            fragment_words = [t.text for t in window_tokens]
-                            fragment_pos = [t.pos_ for t in window_tokens]
-                        else:
-                            fragment_words = window_tokens
-                            fragment_pos = pos_tags[i:end] if i + window_size <= len(pos_tags) else [""] * len(window_tokens)
-                            
-                        fragment_text = " ".join(fragment_words).strip()
-                        total_syllables = sum(self._count_syllables(str(word)) for word in fragment_words)
-
-                        self.logger.debug(f"[FALLBACK] Fragment {fragment_idx}: '{fragment_text}' [words: {i}-{end - 1}]")
-
-                        # Create chunk with consistent order as line_chunker.py
-                        chunk = {
-                            "chunk_id": f"fragment_{line_id}_{fragment_idx}",
-                            "source_chunk_id": source_chunk_id,  # Added reference to source line
-                            "title": line_chunk.get("title", "Unknown"),
-                            "line": line_chunk.get("line"),
-                            "act": line_chunk.get("act"),
-                            "scene": line_chunk.get("scene"),
-                            "text": fragment_text,
-                            "word_index": f"{i},{end - 1}",
-                            "syllables": total_syllables,
-                            "POS": fragment_pos,
-                            "mood": line_chunk.get("mood", "neutral"),
-                            "word_count": len(window_tokens),
-                            "fragment_position": fragment_idx,
-                            "total_fragments_in_line": None  # Will update this later
-                        }
-                        chunks.append(chunk)
-                        used_indices.update(range(i, end))
-                        fragment_idx += 1
-                        break  # break after first valid window at position i
-                    i += 1
-
-        # Update total_fragments_in_line for all chunks
-        from collections import defaultdict
-        line_to_count = defaultdict(int)
-        for chunk in chunks:
-            key = (chunk['title'], chunk['act'], chunk['scene'], chunk['line'])
-            line_to_count[key] += 1
-        for chunk in chunks:
-            key = (chunk['title'], chunk['act'], chunk['scene'], chunk['line'])
-            chunk['total_fragments_in_line'] = line_to_count[key]
+        # Update total_fragments_in_line for all chunks; fragments of a line
+        # are emitted contiguously, so a single grouped pass is enough
+        for _, group in groupby(chunks, key=itemgetter('title', 'act', 'scene', 'line')):
+            group = list(group)
+            total = len(group)
+            for chunk in group:
+                chunk['total_fragments_in_line'] = total
 
         self.logger.info(f"Completed fragment chunking: created {len(chunks)} fragments")
         return chunks
 
+    def chunk_from_line_chunks_soa(self, line_chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Columnar variant of chunk_from_line_chunks.
+
+        Instead of one dict per fragment, returns a dict of parallel columns
+        (lists for strings, compact arrays for integers). Use
+        fragment_columns_to_records() to get the dict-per-chunk form back.
+        """
+        self.logger.info("Starting columnar fragment chunking from line chunks")
+        columns = {
+            "chunk_id": [],
+            "source_chunk_id": [],
+            "title": [],
+            "line": [],
+            "act": [],
+            "scene": [],
+            "text": [],
+            "word_index_start": array('H'),
+            "word_index_end": array('H'),
+            "syllables": array('H'),
+            "POS": [],
+            "mood": [],
+            "word_count": array('B'),
+            "fragment_position": array('H'),
+            "total_fragments_in_line": array('H'),
+        }
+
+        for line_chunk, fragments in self._iter_line_fragments(line_chunks):
+            line_id = line_chunk['chunk_id']
+            title = _intern(line_chunk.get("title", "Unknown"))
+            line = line_chunk.get("line")
+            act = _intern(line_chunk.get("act"))
+            scene = _intern(line_chunk.get("scene"))
+            mood = _intern(line_chunk.get("mood", "neutral"))
+            total = len(fragments)
+
+            for fragment_idx, (fragment_text, start, end, total_syllables, fragment_pos) in enumerate(fragments):
+                columns["chunk_id"].append(f"fragment_{line_id}_{fragment_idx}")
+                columns["source_chunk_id"].append(line_id)
+                columns["title"].append(title)
+                columns["line"].append(line)
+                columns["act"].append(act)
+                columns["scene"].append(scene)
+                columns["text"].append(fragment_text)
+                columns["word_index_start"].append(start)
+                columns["word_index_end"].append(end)
+                columns["syllables"].append(total_syllables)
+                columns["POS"].append(fragment_pos)
+                columns["mood"].append(mood)
+                columns["word_count"].append(end - start + 1)
+                columns["fragment_position"].append(fragment_idx)
+                columns["total_fragments_in_line"].append(total)
+
+        self.logger.info(f"Completed columnar fragment chunking: created {len(columns['chunk_id'])} fragments")
+        return columns
+
     def chunk_text(self, text: str) -> List[Dict[str, Any]]:
-        raise NotImplementedError("Use chunk_from_line_chunks instead")
\ No newline at end of file
+        raise NotImplementedError("Use chunk_from_line_chunks instead")
+
+
+# Per-process chunker used by the sharded path in FragmentChunker._iter_line_fragments
+_shard_chunker: Optional[FragmentChunker] = None
+
+
+def _init_shard_worker(min_words: int, max_words: int, batch_size: int) -> None:
+    global _shard_chunker
+    _shard_chunker = FragmentChunker(
+        min_words=min_words,
+        max_words=max_words,
+        logger=CustomLogger("FragmentChunkerWorker", log_level="WARNING"),
+        batch_size=batch_size,
+    )
+    _shard_chunker.max_words = max_words
+
+
+def _fragment_shard(texts: List[str]) -> List[List[Tuple[str, int, int, int, List[str]]]]:
+    return list(_shard_chunker._fragment_texts(texts))
+
+
+def fragment_columns_to_records(columns: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Lazily rebuild chunk dicts from the output of chunk_from_line_chunks_soa."""
+    for i in range(len(columns["chunk_id"])):
+        yield {
+            "chunk_id": columns["chunk_id"][i],
+            "source_chunk_id": columns["source_chunk_id"][i],
+            "title": columns["title"][i],
+            "line": columns["line"][i],
+            "act": columns["act"][i],
+            "scene": columns["scene"][i],
+            "text": columns["text"][i],
+            "word_index": f"{columns['word_index_start'][i]},{columns['word_index_end'][i]}",
+            "syllables": columns["syllables"][i],
+            "POS": columns["POS"][i],
+            "mood": columns["mood"][i],
+            "word_count": columns["word_count"][i],
+            "fragment_position": columns["fragment_position"][i],
+            "total_fragments_in_line": columns["total_fragments_in_line"][i],
+        }
@@ -5,50 +5,90 @@ This version resets the line numbering at each new scene.
 We can therefore reference, for example, "line 28 of Act II, Scene II, in Macbeth."
 """
 
+import os
 import re
 import time
-import os
-import json
-from typing import List, Dict, Any, Tuple, Optional
+from array import array
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple, Optional, Iterable, Iterator, NamedTuple
 from .base import ChunkBase
+from ._spacy import SPACY_AVAILABLE, DISABLE_PARSER, get_nlp, words_and_pos
+from ._text import WORD_RE, count_syllables, line_syllables, normalize_quotes
 from modules.utils.logger import CustomLogger
 
-try:
-    import spacy
-    try:
-        nlp = spacy.load("en_core_web_sm")
-        SPACY_AVAILABLE = True
-    except OSError:
-        SPACY_AVAILABLE = False
-except ImportError:
-    SPACY_AVAILABLE = False
 
-def _normalize_quotes(line: str) -> str:
-    """Replace curly quotes/apostrophes with plain ASCII."""
-    replacements = {
-        "\u2018": "'",
-        "\u2019": "'",
-        "\u201C": '"',
-        "\u201D": '"',
-    }
-    for old, new in replacements.items():
-        line = line.replace(old, new)
-    return line
+@lru_cache(maxsize=16384)
+def _tokenize(line: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Words and POS tags of a line, cached so repeated lines are tokenized once."""
+    words, pos_tags = words_and_pos(get_nlp()(line, disable=DISABLE_PARSER))
+    return tuple(words), tuple(pos_tags)
+
+
+class LineChunk(NamedTuple):
+    """Read-only line chunk record.
+    
+    A tuple with fixed field offsets instead of a per-chunk dict; use
+    LineChunker.iter_line_chunks() to walk chunks in memory and to_dict()
+    where the dict form is needed (e.g. JSON output).
+    """
+    chunk_id: str
+    title: str
+    line: int
+    act: Optional[str]
+    scene: Optional[str]
+    text: str
+    syllables: int
+    POS: List[str]
+    mood: str
+    word_count: int
+    
+    @property
+    def word_index(self) -> str:
+        return f"0,{self.word_count - 1}"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Dict form with the same key order as the chunks written to JSON."""
+        return {
+            "chunk_id": self.chunk_id,
+            "title": self.title,
+            "line": self.line,
+            "act": self.act,
+            "scene": self.scene,
+            "text": self.text,
+            "word_index": self.word_index,
+            "syllables": self.syllables,
+            "POS": self.POS,
+            "mood": self.mood,
+            "word_count": self.word_count,
+        }
+
 
 class LineChunker(ChunkBase):
     """Chunker for processing Shakespeare's text into full lines,
     resetting line numbering at each new scene (and new play title).
     """
     
-    def __init__(self, logger: Optional[CustomLogger] = None):
+    def __init__(self, logger: Optional[CustomLogger] = None, batch_size: int = 1000,
+                 n_process: int = 1):
         super().__init__(chunk_type='line')
         self.logger = logger or CustomLogger("LineChunker")
         self.logger.info("Initializing LineChunker")
         
+        # Number of lines handed to spaCy per nlp.pipe batch
+        self.batch_size = batch_size
+        # Worker processes for nlp.pipe. Only used on POSIX, where workers are
+        # forked; spawning them on Windows costs more than it saves here
+        self.n_process = n_process if os.name == 'posix' else 1
+        if self.n_process != n_process:
+            self.logger.info("n_process > 1 is only supported on POSIX; tokenizing in-process")
+        
         if not SPACY_AVAILABLE:
             self.logger.warning("spaCy is not available - using fallback tokenization")
             self.logger.info("To install spaCy: pip install spacy && python -m spacy download en_core_web_sm")
         
+        # These patterns are matched against one short line at a time and are all
+        # anchored, so they cannot backtrack badly; stdlib re is used on purpose,
+        # as re2's per-call overhead makes it ~10x slower on inputs this small.
         # Updated regex for detecting acts (roman numerals or INDUCTION) and scenes (roman, digits, or PROLOGUE)
         self.act_pattern = re.compile(r'^ACT\s+((?:INDUCTION|[IVX]+))', re.IGNORECASE)
         self.scene_pattern = re.compile(r'^SCENE\s+((?:PROLOGUE|[IVX]+|\d+))', re.IGNORECASE)
@@ -60,7 +100,7 @@ class LineChunker(ChunkBase):
         self.all_caps_pattern = re.compile(r'^[A-Z\s.,;:!?]+$')
         
         # Known Shakespeare titles (use uppercase for matching).
-        self.shakespeare_titles = {
+        self.shakespeare_titles = frozenset({
             "THE SONNETS",
             "ALL'S WELL THAT ENDS WELL",
             "THE TRAGEDY OF ANTONY AND CLEOPATRA",
@@ -105,7 +145,16 @@ class LineChunker(ChunkBase):
             "THE PHOENIX AND THE TURTLE",
             "THE RAPE OF LUCRECE",
             "VENUS AND ADONIS"
-        }
+        })
+        
+        # Cheap guards checked before upper-casing a line for the title lookup:
+        # almost no line shares a title's exact length and first letter, and a
+        # line that does is only compared against the titles of that length
+        self._title_first_chars = frozenset(t[0] for t in self.shakespeare_titles)
+        titles_by_len = {}
+        for t in self.shakespeare_titles:
+            titles_by_len.setdefault(len(t), set()).add(t)
+        self._titles_by_len = {n: frozenset(ts) for n, ts in titles_by_len.items()}
         
         # Track detected titles, acts, and scenes for validation
         self.titles_detected = set()
@@ -115,53 +164,80 @@ class LineChunker(ChunkBase):
         self.logger.debug("Compiled regular expressions for text parsing")
     
     def _count_syllables(self, word: str) -> int:
-        # Skip if it's punctuation or doesn't contain at least one letter
-        if not any(c.isalpha() for c in word):
-            return 0
-
-        word = word.lower()
-        if len(word) <= 3:
-            return 1
-        if word.endswith('e'):
-            word = word[:-1]
-        vowels = re.findall(r'[aeiouy]+', word)
-        return max(1, len(vowels))
+        return count_syllables(word)
     
-    def _process_line_with_spacy(self, line: str) -> Tuple[List[str], List[str], int]:
-        """Use spaCy for tokenization/POS, excluding punctuation and whitespace."""
-        if not SPACY_AVAILABLE:
-            words = re.findall(r"\b\w[\w']*\b", line)
-            pos_tags = [""] * len(words)
-            return words, pos_tags, len(words)
+    def _process_line_with_spacy(self, line: str, doc: Any = None) -> Tuple[List[str], List[str], int]:
+        """Use spaCy for tokenization/POS, excluding punctuation and whitespace.
+        
+        Pass `doc` when the line has already been parsed (e.g. via nlp.pipe).
+        """
+        if doc is None:
+            nlp = get_nlp() if SPACY_AVAILABLE else None
+            if nlp is None:
+                words = WORD_RE.findall(line)
+                pos_tags = [""] * len(words)
+                return words, pos_tags, len(words)
         
         try:
-            doc = nlp(line)
-            words = [token.text for token in doc if not token.is_punct and not token.is_space]
-            pos_tags = [token.pos_ for token in doc if not token.is_punct and not token.is_space]
+            if doc is None:
+                words, pos_tags = _tokenize(line)
+                return list(words), list(pos_tags), len(words)
+            words, pos_tags = words_and_pos(doc)
             return words, pos_tags, len(words)
         except Exception as e:
             self.logger.error(f"spaCy error: {e}")
-            words = re.findall(r"\b\w[\w']*\b", line)
+            words = WORD_RE.findall(line)
             pos_tags = [""] * len(words)
             return words, pos_tags, len(words)
     
     def _is_structural_line(self, line: str) -> bool:
         """Check if line is an act/scene line or all-caps structural text."""
-        if self.act_pattern.match(line):
+        if self._act_match(line):
             return True
-        if self.scene_pattern.match(line):
+        if self._scene_match(line):
             return True
-        if self.all_caps_pattern.match(line):
-            return True
-        return False
+        return self._is_all_caps_line(line)
+
+    def _is_all_caps_line(self, line: str) -> bool:
+        """Check if line is all-caps structural text (e.g. a speaker or stage heading)."""
+        # Any line the all-caps pattern accepts is either isupper() or has no
+        # letters at all (so starts with punctuation); dialogue is neither
+        return bool((line.isupper() or not line[:1].isalpha()) and self.all_caps_pattern.match(line))
+
+    def _act_match(self, line: str) -> Optional[re.Match]:
+        """act_pattern.match, skipped for lines that cannot start with "ACT"."""
+        if line[:3].upper() != "ACT":
+            return None
+        return self.act_pattern.match(line)
+
+    def _scene_match(self, line: str) -> Optional[re.Match]:
+        """scene_pattern.match, skipped for lines that cannot start with "SCENE"."""
+        if line[:5].upper() != "SCENE":
+            return None
+        return self.scene_pattern.match(line)
     
     def chunk_text(self, text: str) -> List[Dict[str, Any]]:
-        start_time = time.time()
-        self.logger.info("Starting text chunking process")
         self.logger.debug(f"Input text length: {len(text)} chars")
+        return self.chunk_lines(text.split('\n'))
+    
+    def chunk_lines(self, lines: Iterable[str]) -> List[Dict[str, Any]]:
+        """Chunk an iterable of raw lines, e.g. an open file object.
         
-        lines = text.split('\n')
-        self.logger.debug(f"Split text into {len(lines)} raw lines")
+        Lines are consumed one at a time, so a file can be chunked without
+        first reading the whole corpus into memory.
+        """
+        self.chunk_lines_soa(lines)
+        return self.chunks
+    
+    def chunk_lines_soa(self, lines: Iterable[str]) -> Dict[str, Any]:
+        """Columnar variant of chunk_lines.
+        
+        Instead of one dict per line, returns a dict of parallel columns
+        (lists for strings, compact arrays for integers). The dict-per-chunk
+        form is only built when `chunks` is read; see line_columns_to_records().
+        """
+        start_time = time.time()
+        self.logger.info("Starting text chunking process")
         
         current_title = "Unknown"
         current_act = None
@@ -173,24 +249,62 @@ class LineChunker(ChunkBase):
         # We'll keep a separate line index that resets each time we detect a new scene or new title
         scene_line_index = 0
         
-        chunks = []
+        columns = {
+            "chunk_id": [],
+            "title": [],
+            "line": array('I'),
+            "act": [],
+            "scene": [],
+            # Spoken lines; tokenized in one batch after the loop
+            "text": [],
+            "syllables": array('I'),
+            "POS": [],
+            "mood": [],
+            "word_count": array('I'),
+        }
+        # (act, scene) -> chunk indices, for get_lines_by_act_scene/get_sonnet_lines
+        by_act_scene = {}
         
         # Reset tracking dictionaries for validation
         self.titles_detected = set()
         self.acts_by_title = {}
         self.scenes_by_title_and_act = {}
         
+        # The loop below runs once per raw line of the corpus, so look up the
+        # per-line callables once here rather than on every iteration
+        titles_by_len = self._titles_by_len
+        title_first_chars = self._title_first_chars
+        act_match_line = self._act_match
+        scene_match_line = self._scene_match
+        sonnet_number_match = self.sonnet_number_pattern.match
+        is_all_caps_line = self._is_all_caps_line
+        append_chunk_id = columns["chunk_id"].append
+        append_title = columns["title"].append
+        append_line = columns["line"].append
+        append_act = columns["act"].append
+        append_scene = columns["scene"].append
+        append_text = columns["text"].append
+        append_mood = columns["mood"].append
+        # Sonnet numbers are only looked for under THE SONNETS; recomputed on title change
+        in_sonnets = "SONNETS" in current_title.upper()
+        # Per-line debug messages are only formatted when they would be emitted
+        debug = self.logger.is_debug_enabled()
+        
         for raw_line in lines:
             line = raw_line.strip()
             if not line:
                 continue
             
             # Normalize quotes
-            line = _normalize_quotes(line)
+            line = normalize_quotes(line)
             
             # Check if line matches a known Shakespeare title (in uppercase)
-            if line.upper() in self.shakespeare_titles:
+            title_candidates = titles_by_len.get(len(line))
+            if (title_candidates
+                    and line[:1].upper() in title_first_chars
+                    and line.upper() in title_candidates):
                 current_title = line
+                in_sonnets = "SONNETS" in current_title.upper()
                 self.logger.info(f"Detected title: {current_title}")
                 # Track titles for validation
                 self.titles_detected.add(current_title)
@@ -205,7 +319,7 @@ class LineChunker(ChunkBase):
                 continue
             
             # Check for ACT
-            act_match = self.act_pattern.match(line)
+            act_match = act_match_line(line)
             if act_match:
                 current_act = act_match.group(1).upper()
                 current_scene = None
@@ -221,7 +335,7 @@ class LineChunker(ChunkBase):
                 continue
             
             # Check for SCENE
-            scene_match = self.scene_pattern.match(line)
+            scene_match = scene_match_line(line)
             if scene_match:
                 current_scene = scene_match.group(1).upper()  # could be "PROLOGUE" or digits
                 scene_line_index = 0  # reset line numbering for new scene
@@ -235,8 +349,8 @@ class LineChunker(ChunkBase):
                 continue
             
             # Check for sonnet numbers if this is THE SONNETS
-            if "SONNETS" in current_title.upper():
-                sonnet_match = self.sonnet_number_pattern.match(line)
+            if in_sonnets:
+                sonnet_match = sonnet_number_match(line)
                 if sonnet_match:
                     current_act = sonnet_match.group(1)
                     current_scene = ""
@@ -251,32 +365,28 @@ class LineChunker(ChunkBase):
                     
                     continue
             
-            # If this looks like a structural line (all-caps or something we skip), skip it
-            if self._is_structural_line(line):
-                self.logger.debug(f"Skipping structural line: {line}")
+            # If this looks like a structural line (all-caps or something we skip), skip it.
+            # Act and scene headings were already handled above.
+            if is_all_caps_line(line):
+                if debug:
+                    self.logger.debug(f"Skipping structural line: {line}")
                 continue
             
             # Now it's a regular spoken (or textual) line. Increment counters.
             chunk_counter += 1
             scene_line_index += 1
             
-            words, pos_tags, word_count = self._process_line_with_spacy(line)
-            total_syllables = sum(self._count_syllables(w) for w in words)
-            
-            chunk = {
-                "chunk_id": f"chunk_{chunk_counter}",
-                "title": current_title,
-                # This 'line' is the line number within the current scene
-                "line": scene_line_index,  
-                "act": current_act,
-                "scene": current_scene,
-                "text": line,
-                "word_index": f"0,{word_count - 1}",
-                "syllables": total_syllables,
-                "POS": pos_tags,
-                "mood": "neutral",
-                "word_count": word_count
-            }
+            # Word-level columns are filled in below once all spoken lines
+            # have been tokenized in a single batch
+            by_act_scene.setdefault((current_act, current_scene), []).append(chunk_counter - 1)
+            append_chunk_id(f"chunk_{chunk_counter}")
+            append_title(current_title)
+            # This 'line' is the line number within the current scene
+            append_line(scene_line_index)
+            append_act(current_act)
+            append_scene(current_scene)
+            append_text(line)
+            append_mood("neutral")
             
             # Log warning for incomplete metadata
             if current_act is None or current_scene is None:
@@ -285,20 +395,104 @@ class LineChunker(ChunkBase):
                     f"act={current_act}, scene={current_scene}, line={scene_line_index}: {line[:50]}..."
                 )
             
-            chunks.append(chunk)
-            self.logger.debug(
-                f"Created chunk_{chunk_counter} for title='{current_title}', "
-                f"Act={current_act}, Scene={current_scene}, line_in_scene={scene_line_index}"
-            )
+            if debug:
+                self.logger.debug(
+                    f"Created chunk_{chunk_counter} for title='{current_title}', "
+                    f"Act={current_act}, Scene={current_scene}, line_in_scene={scene_line_index}"
+                )
+        
+        # Tokenize every spoken line in one spaCy stream instead of one nlp() call per line.
+        # Repeated lines ("Ay, my lord.", "Exeunt.") are only tokenized once.
+        spoken_lines = columns["text"]
+        unique_lines = list(dict.fromkeys(spoken_lines))
+        nlp = get_nlp() if SPACY_AVAILABLE else None
+        if nlp is not None:
+            docs = nlp.pipe(unique_lines, batch_size=self.batch_size,
+                            n_process=self.n_process, disable=DISABLE_PARSER)
+        else:
+            docs = (None for _ in unique_lines)
         
-        self.chunks = chunks
+        tokenized = {}
+        for line, doc in zip(unique_lines, docs):
+            words, pos_tags, word_count = self._process_line_with_spacy(line, doc)
+            tokenized[line] = (sum(line_syllables(words)), pos_tags, word_count)
+        
+        for line in spoken_lines:
+            syllables, pos_tags, word_count = tokenized[line]
+            columns["syllables"].append(syllables)
+            # Each chunk gets its own POS list, as before
+            columns["POS"].append(list(pos_tags))
+            columns["word_count"].append(word_count)
+        
+        self._columns = columns
+        self._chunks = None
+        self._by_act_scene = by_act_scene
+        n_chunks = len(spoken_lines)
         elapsed = time.time() - start_time
-        self.logger.info(f"Completed text chunking: {len(chunks)} chunks in {elapsed:.2f}s")
+        self.logger.info(f"Completed text chunking: {n_chunks} chunks in {elapsed:.2f}s")
         
         # Print validation summary of detected titles, acts, and scenes
         self._print_detection_summary()
         
-        return chunks
+        return columns
+    
+    @property
+    def chunks(self) -> List[Dict[str, Any]]:
+        """Line chunks as dicts, built from the columns on first access.
+        
+        The columns and their act/scene index are dropped once the dicts
+        exist, so only one form of the chunks is held; the index is rebuilt
+        from the dicts if it is needed again.
+        """
+        if self._chunks is None:
+            self._by_act_scene = None
+            self._chunks = list(line_columns_to_records(self._columns))
+            self._columns = None
+        return self._chunks
+    
+    @chunks.setter
+    def chunks(self, value: List[Dict[str, Any]]) -> None:
+        # Chunks assigned from outside replace the columns they came from
+        if value is not getattr(self, "_chunks", None):
+            self._columns = None
+            self._by_act_scene = None
+        self._chunks = value
+    
+    def iter_line_chunks(self) -> Iterator[LineChunk]:
+        """Iterate over the chunks as LineChunk records.
+        
+        Reads straight from the columns after chunk_lines_soa, so no chunk
+        dicts are built; once `chunks` has been read, walks the dicts instead.
+        """
+        if self._columns is None:
+            for c in self.chunks:
+                yield LineChunk(c["chunk_id"], c["title"], c["line"], c["act"], c["scene"],
+                                c["text"], c["syllables"], c["POS"], c["mood"], c["word_count"])
+            return
+        columns = self._columns
+        yield from map(LineChunk, columns["chunk_id"], columns["title"], columns["line"],
+                       columns["act"], columns["scene"], columns["text"], columns["syllables"],
+                       columns["POS"], columns["mood"], columns["word_count"])
+    
+    def _act_scene_index(self) -> Dict[Tuple[Optional[str], Optional[str]], List[int]]:
+        """(act, scene) -> chunk indices; built on first use for assigned chunks."""
+        if self._by_act_scene is None:
+            index = {}
+            for i, c in enumerate(self.chunks):
+                index.setdefault((c.get('act'), c.get('scene')), []).append(i)
+            self._by_act_scene = index
+        return self._by_act_scene
+    
+    def _num_chunks(self) -> int:
+        if self._chunks is not None:
+            return len(self._chunks)
+        return len(self._columns["chunk_id"])
+    
+    def _row(self, i: int) -> Dict[str, Any]:
+        """Chunk i as a dict, without materializing the other chunks."""
+        if self._chunks is not None:
+            return self._chunks[i]
+        return _line_record(self._columns, i)
     
     def _print_detection_summary(self) -> None:
         """Print a summary of detected titles, acts, and scenes for validation."""
@@ -316,46 +510,65 @@ class LineChunker(ChunkBase):
     
     def get_lines_by_act_scene(self, act: str, scene: str) -> List[Dict[str, Any]]:
         """Retrieve lines that match a given Act and Scene."""
-        if not self.chunks:
+        if not self._num_chunks():
             self.logger.warning("No chunks available. Process text first.")
             return []
         
-        matches = [
-            c for c in self.chunks
-            if c.get('act') == act and c.get('scene') == scene
-        ]
+        matches = [self._row(i) for i in self._act_scene_index().get((act, scene), ())]
         self.logger.info(f"Found {len(matches)} lines in Act {act}, Scene {scene}")
         return matches
     
     def get_dialogue_exchange(self, start_index: int, max_lines: int = 10) -> List[Dict[str, Any]]:
         """Return up to `max_lines` consecutive chunks starting from `start_index` in the .chunks list."""
-        if not self.chunks:
+        n_chunks = self._num_chunks()
+        if not n_chunks:
             self.logger.warning("No chunks available. Process text first.")
             return []
         
-        if start_index < 0 or start_index >= len(self.chunks):
+        if start_index < 0 or start_index >= n_chunks:
             self.logger.warning(
-                f"Invalid start_index {start_index} for {len(self.chunks)} total chunks.")
+                f"Invalid start_index {start_index} for {n_chunks} total chunks.")
             return []
         
-        end_idx = min(start_index + max_lines, len(self.chunks))
-        exchange = self.chunks[start_index:end_idx]
+        end_idx = min(start_index + max_lines, n_chunks)
+        exchange = [self._row(i) for i in range(start_index, end_idx)]
         self.logger.info(f"Retrieved {len(exchange)} lines of dialogue exchange.")
         return exchange
     
     def get_sonnet_lines(self, sonnet_number: str) -> List[Dict[str, Any]]:
         """Get lines from a particular sonnet number (act=sonnet_number, scene='')."""
-        if not self.chunks:
+        if not self._num_chunks():
             self.logger.warning("No chunks available. Process text first.")
             return []
         
-        sonnet_lines = [
-            c for c in self.chunks
-            if c.get('act') == sonnet_number and c.get('scene') == ""
-        ]
+        # Sonnets are stored as act=<number>, scene=""
+        sonnet_lines = [self._row(i) for i in self._act_scene_index().get((sonnet_number, ""), ())]
         self.logger.info(f"Found {len(sonnet_lines)} lines in Sonnet {sonnet_number}")
         return sonnet_lines
 
+
+def _line_record(columns: Dict[str, Any], i: int) -> Dict[str, Any]:
+    word_count = columns["word_count"][i]
+    return {
+        "chunk_id": columns["chunk_id"][i],
+        "title": columns["title"][i],
+        "line": columns["line"][i],
+        "act": columns["act"][i],
+        "scene": columns["scene"][i],
+        "text": columns["text"][i],
+        "word_index": f"0,{word_count - 1}",
+        "syllables": columns["syllables"][i],
+        "POS": columns["POS"][i],
+        "mood": columns["mood"][i],
+        "word_count": word_count,
+    }
+
+
+def line_columns_to_records(columns: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Lazily rebuild chunk dicts from the output of chunk_lines_soa."""
+    for i in range(len(columns["chunk_id"])):
+        yield _line_record(columns, i)
+
 if __name__ == "__main__":
     input_file = "data/processed_texts/complete_shakespeare_ready.txt"
     output_file = "data/processed_chunks/lines.json"
@@ -365,8 +578,7 @@ if __name__ == "__main__":
         chunker = LineChunker(logger=logger)
         logger.info(f"Reading input file: {input_file}")
         try:
-            with open(input_file, 'r', encoding='utf-8') as f:
-                text = f.read()
+            f = open(input_file, 'r', encoding='utf-8')
         except FileNotFoundError:
             logger.critical(f"Input file not found: {input_file}")
             exit(1)
@@ -375,19 +587,17 @@ if __name__ == "__main__":
             exit(1)
         
         logger.info("Processing text...")
-        chunks = chunker.chunk_text(text)
+        # Stream the file line by line rather than holding the whole text
+        with f:
+            chunks = chunker.chunk_lines(f)
         logger.info(f"Generated {len(chunks)} line chunks.")
         
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
         logger.info(f"Saving chunks to: {output_file}")
         
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'chunk_type': 'line',
-                    'chunks': chunks,
-                    'total_chunks': len(chunks)
-                }, f, indent=2)
+            # Streams the chunks one at a time (via orjson when installed)
+            # instead of pretty-printing the whole list with json.dump
+            chunker.save_chunks(output_file)
             logger.info("Chunks saved successfully!")
         except Exception as e:
             logger.critical(f"Error saving output file: {str(e)}")
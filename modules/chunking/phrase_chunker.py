@@ -5,19 +5,15 @@ This module provides functionality to chunk Shakespeare's text into phrases
 based on punctuation breaks, preserving the relationship to parent lines.
 """
 import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from .base import ChunkBase
+from ._spacy import SPACY_AVAILABLE, DISABLE_PARSER, get_nlp, word_positions
+from ._text import WORD_RE, count_syllables, line_syllables, normalize_quotes
 from modules.utils.logger import CustomLogger
 
-try:
-    import spacy
-    try:
-        nlp = spacy.load("en_core_web_sm")
-        SPACY_AVAILABLE = True
-    except OSError:
-        SPACY_AVAILABLE = False
-except ImportError:
-    SPACY_AVAILABLE = False
+# Phrase boundaries: sentence punctuation and commas, captured so the
+# delimiter can be reattached to the phrase it ends
+_PHRASE_SPLIT = re.compile(r'([.,!?;:])')
 
 
 class PhraseChunker(ChunkBase):
@@ -36,57 +32,42 @@ class PhraseChunker(ChunkBase):
             self.logger.warning("spaCy is not available - using fallback tokenization")
             self.logger.info("To install spaCy: pip install spacy && python -m spacy download en_core_web_sm")
 
-        self.phrase_pattern = re.compile(r'([.!?;:])')
-        self.logger.debug("Compiled regular expressions for text parsing")
 
     def _normalize_quotes(self, line: str) -> str:
         """Replace curly quotes/apostrophes with plain ASCII."""
-        replacements = {
-            "\u2018": "'",
-            "\u2019": "'",
-            "\u201C": '"',
-            "\u201D": '"',
-        }
-        for old, new in replacements.items():
-            line = line.replace(old, new)
-        return line
+        return normalize_quotes(line)
 
     def _count_syllables(self, word: str) -> int:
-        # Skip if it's punctuation or doesn't contain at least one letter
-        if not any(c.isalpha() for c in word):
-            return 0
-
-        word = word.lower()
-        if len(word) <= 3:
-            return 1
-        if word.endswith('e'):
-            word = word[:-1]
-        vowels = re.findall(r'[aeiouy]+', word)
-        return max(1, len(vowels))
-
-    def _process_line_with_spacy(self, line: str) -> List[Any]:
-        """Process a line with spaCy, excluding punctuation and whitespace."""
-        if not SPACY_AVAILABLE:
-            words = re.findall(r"\b\w[\w']*\b", line)
-            return words
-        
-        try:
-            # Normalize quotes first
-            line = self._normalize_quotes(line)
-            
-            doc = nlp(line)
-            # Filter out punctuation and whitespace
-            tokens = [token for token in doc if not token.is_punct and not token.is_space]
-            return tokens
-        except Exception as e:
-            self.logger.error(f"spaCy error: {e}")
-            words = re.findall(r"\b\w[\w']*\b", line)
-            return words
+        return count_syllables(word)
+
+    def _process_line_with_spacy(self, line: str) -> Tuple[List[str], List[str], List[int], List[int]]:
+        """Tokenize a line, excluding punctuation and whitespace.
+
+        Returns the words, their POS tags ("" without spaCy) and the character
+        offsets where each word starts and ends in the line, so phrases can be
+        cut out of a single tokenization by position.
+        """
+        nlp = get_nlp() if SPACY_AVAILABLE else None
+        if nlp is not None:
+            try:
+                doc = nlp(line, disable=DISABLE_PARSER)
+                # Filter out punctuation and whitespace
+                tokens = [doc[i] for i in word_positions(doc)]
+                return ([t.text for t in tokens], [t.pos_ for t in tokens],
+                        [t.idx for t in tokens], [t.idx + len(t) for t in tokens])
+            except Exception as e:
+                self.logger.error(f"spaCy error: {e}")
+
+        matches = list(WORD_RE.finditer(line))
+        return ([m.group() for m in matches], [""] * len(matches),
+                [m.start() for m in matches], [m.end() for m in matches])
 
     def chunk_from_line_chunks(self, line_chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         self.logger.info("Starting phrase chunking from line chunks")
         self.logger.debug(f"Processing {len(line_chunks)} line chunks")
         chunks = []
+        # Per-phrase debug messages are only formatted when they would be emitted
+        debug = self.logger.is_debug_enabled()
 
         for line_chunk in line_chunks:
             line_text = line_chunk['text']
@@ -94,82 +75,65 @@ class PhraseChunker(ChunkBase):
             source_chunk_id = line_chunk['chunk_id']  # Store original chunk_id
             
             # Normalize the text
-            line_text = self._normalize_quotes(line_text)
+            line_text = normalize_quotes(line_text)
 
-            # Process line with spaCy and get word tokens (no punctuation/whitespace)
-            tokens = self._process_line_with_spacy(line_text)
-            
-            # Get just the text of each token
-            if SPACY_AVAILABLE and all(hasattr(t, 'text') for t in tokens):
-                token_words = [t.text for t in tokens]
-                # Get POS tags when available
-                token_pos = [t.pos_ for t in tokens]
-            else:
-                token_words = tokens
-                token_pos = [""] * len(tokens)
-
-            # Split the line into phrases using punctuation
-            phrase_pattern = re.compile(r'([.!?;:])')
-            major_parts = phrase_pattern.split(line_text)
-
-            phrases = []
-            i = 0
-            while i < len(major_parts):
-                if i + 1 < len(major_parts) and phrase_pattern.match(major_parts[i + 1]):
-                    phrases.append(major_parts[i] + major_parts[i + 1])
-                    i += 2
-                else:
-                    if major_parts[i].strip():
-                        phrases.append(major_parts[i])
-                    i += 1
+            # Tokenize the line once; phrases are sliced out of it by offset
+            token_words, token_pos, token_starts, token_ends = self._process_line_with_spacy(line_text)
 
+            # Split the line into phrases on sentence punctuation and commas in
+            # one pass, reattaching each delimiter to the text before it and
+            # recording the character offset where each phrase ends
             final_phrases = []
-            for phrase in phrases:
-                comma_parts = phrase.split(',')
-                for j, part in enumerate(comma_parts):
-                    cleaned = part.strip()
-                    if cleaned:
-                        if j < len(comma_parts) - 1:
-                            final_phrases.append(cleaned + ',')
-                        else:
-                            final_phrases.append(cleaned)
-
-            used_indices = set()
+            phrase_ends = []
+            buf = ""
+            offset = 0
+            for part in _PHRASE_SPLIT.split(line_text):
+                part_end = offset + len(part)
+                if _PHRASE_SPLIT.fullmatch(part):
+                    # A comma with nothing before it does not start a phrase
+                    if buf.strip() or part != ',':
+                        final_phrases.append((buf + part).strip())
+                        phrase_ends.append(part_end)
+                    buf = ""
+                else:
+                    buf = part
+                offset = part_end
+            if buf.strip():
+                final_phrases.append(buf.strip())
+                phrase_ends.append(offset)
+
+            # Phrases and words are both in line order, so each phrase's words
+            # are the next run of words starting before the phrase's end
+            cursor = 0
+            n_words = len(token_starts)
+            crossed = False
 
             for phrase_idx, phrase in enumerate(final_phrases):
-                # Process the phrase with spaCy, excluding punctuation/whitespace
-                phrase_tokens = self._process_line_with_spacy(phrase)
-                
-                if SPACY_AVAILABLE and all(hasattr(t, 'text') for t in phrase_tokens):
-                    phrase_words = [t.text for t in phrase_tokens]
-                else:
-                    phrase_words = phrase_tokens
-                
-                phrase_text = " ".join(phrase_words).strip()
+                end_char = phrase_ends[phrase_idx]
+                phrase_start = cursor
+                while cursor < n_words and token_starts[cursor] < end_char:
+                    cursor += 1
+                phrase_end = cursor - 1
+                phrase_words = token_words[phrase_start:cursor]
+
+                # spaCy can keep a word whole across a phrase boundary (e.g.
+                # "thing?—Come"); neither phrase then has its own words, so
+                # skip both rather than move the word into one of them
+                starts_crossed = crossed
+                crossed = bool(phrase_words) and token_ends[phrase_end] > end_char
+                if starts_crossed or crossed:
+                    continue
 
                 if len(phrase_words) < 3:
                    continue  # Skip phrases with fewer than 3 words
 
-                if not phrase_words:
-                    continue
-
-                try:
-                    # Find the first matching slice in token_words
-                    for i in range(len(token_words) - len(phrase_words) + 1):
-                        if token_words[i:i+len(phrase_words)] == phrase_words:
-                            phrase_start = i
-                            phrase_end = i + len(phrase_words) - 1
-                            if any(idx in used_indices for idx in range(phrase_start, phrase_end + 1)):
-                                raise ValueError("Overlapping phrase indices")
-                            break
-                    else:
-                        raise ValueError("Phrase words not aligned")
-                except ValueError:
-                    self.logger.warning(f"Could not align phrase in token list: {phrase_words}")
-                    continue
+                phrase_text = " ".join(phrase_words)
+                # The part of the line the chunk covers, from its first word
+                # to the phrase's end
+                phrase_span = line_text[token_starts[phrase_start]:end_char].rstrip()
 
-                phrase_pos_tags = token_pos[phrase_start:phrase_end + 1] if len(token_pos) > phrase_end else []
-                total_syllables = sum(self._count_syllables(str(word)) for word in phrase_words)
+                phrase_pos_tags = token_pos[phrase_start:phrase_end + 1]
+                total_syllables = sum(line_syllables(phrase_words))
 
                 # Create the final chunk dictionary in the same order as line_chunker.py
                 chunk = {
@@ -187,13 +151,13 @@ class PhraseChunker(ChunkBase):
                     "word_count": len(phrase_words),
                     "phrase_position": phrase_idx,
                     "total_phrases_in_line": len(final_phrases),
-                    "ends_with_punctuation": bool(re.search(r'[.!?;:,]$', phrase))
+                    "ends_with_punctuation": bool(re.search(r'[.!?;:,]$', phrase_span))
                 }
                 chunks.append(chunk)
-                used_indices.update(range(phrase_start, phrase_end + 1))
-                self.logger.debug(
-                    f"Created phrase chunk {chunk['chunk_id']} from line {line_id}: {len(phrase)} chars, {len(phrase_words)} words, word_index: {phrase_start}-{phrase_end}"
-                )
+                if debug:
+                    self.logger.debug(
+                        f"Created phrase chunk {chunk['chunk_id']} from line {line_id}: {len(phrase)} chars, {len(phrase_words)} words, word_index: {phrase_start}-{phrase_end}"
+                    )
 
         self.logger.info(f"Completed phrase chunking: created {len(chunks)} chunks from line chunks")
         return chunks
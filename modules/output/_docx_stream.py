@@ -0,0 +1,108 @@
+"""
+Streamed .docx saving shared by the output formatters in the Shakespeare AI
+project.
+
+python-docx keeps the whole document body in memory and serializes it in
+one go on save. StreamedDocument instead writes word/document.xml into the
+package piece by piece, so a long play only ever has its current section in
+memory. Importing this module requires python-docx (and so lxml).
+"""
+import io
+import os
+import zipfile
+from typing import Any, Union
+
+from lxml import etree
+
+
+class StreamedDocument:
+    """
+    Saves a document with its body streamed into word/document.xml piece
+    by piece, so the in-memory body only ever holds what was added since
+    the last flush().
+
+    Whatever the document holds when the stream is entered (the title page)
+    is written first; every flush() then writes out the body's new content
+    and empties it again, so python-docx only searches that small body
+    when it inserts headings, tables and page breaks.
+
+    The package is written to a temporary file next to the output and only
+    moved over output_path once the stream closes without an error, so a
+    failed export never leaves a truncated document or replaces an
+    existing one.
+    """
+
+    def __init__(self, doc: Any, output_path: Union[str, "os.PathLike[str]"]):
+        """
+        Args:
+            doc: Document to stream; its other parts must be final on entry
+            output_path: Path for the output file
+        """
+        self.doc = doc
+        self.output_path = os.fspath(output_path)
+        self._tmp_path = self.output_path + ".tmp"
+
+    def __enter__(self) -> "StreamedDocument":
+        doc = self.doc
+
+        # Save the document once for its other parts, and split
+        # word/document.xml into the part before the streamed content and
+        # the part after it (the body's closing section properties and tags)
+        template = io.BytesIO()
+        doc.save(template)
+        document_member = doc.part.partname.membername
+        document_xml = etree.tostring(doc.element, encoding='UTF-8', standalone=True)
+        split = document_xml.rindex(b'<w:sectPr')
+        self._closing = document_xml[split:]
+
+        body = doc.element.body
+        self._body = body
+        self._sect_pr = body.sectPr
+
+        self._package = zipfile.ZipFile(self._tmp_path, 'w', zipfile.ZIP_DEFLATED)
+        try:
+            with zipfile.ZipFile(template) as parts:
+                for info in parts.infolist():
+                    if info.filename != document_member:
+                        self._package.writestr(info, parts.read(info))
+            self._out = self._package.open(document_member, 'w')
+            self._out.write(document_xml[:split])
+        except BaseException:
+            self._package.close()
+            os.remove(self._tmp_path)
+            raise
+
+        # Leave only the section properties in the body; python-docx needs
+        # them (e.g. for table widths), and new content is inserted before them
+        del body[:]
+        body.append(self._sect_pr)
+        return self
+
+    def flush(self) -> None:
+        """Write out and remove everything added to the body since the last flush."""
+        body = self._body
+        body.remove(self._sect_pr)
+        if len(body):
+            # Serialize the body as a whole and keep what is between its
+            # tags; serializing each child separately would repeat the
+            # document's namespace declarations on every element
+            body_xml = etree.tostring(body, encoding='UTF-8')
+            self._out.write(body_xml[body_xml.index(b'>') + 1:body_xml.rindex(b'</w:body>')])
+            del body[:]
+        body.append(self._sect_pr)
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        completed = False
+        try:
+            if exc_type is None:
+                self.flush()
+                self._out.write(self._closing)
+                completed = True
+        finally:
+            self._out.close()
+            self._package.close()
+            if completed:
+                os.replace(self._tmp_path, self.output_path)
+            else:
+                # Don't leave a truncated document behind
+                os.remove(self._tmp_path)
@@ -2,20 +2,170 @@
 
 import os
 import re
+import sys
 import json
+import importlib.util
+from io import BytesIO
+from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Dict, Any, Optional, Tuple, Union, IO, BinaryIO, cast
 from pathlib import Path
 from modules.utils.logger import CustomLogger
 
-# Try to import docx
 try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# python-docx is only imported when a document is generated (see
+# _ensure_docx_loaded), so loading translations does not pay for it
+DOCX_AVAILABLE = importlib.util.find_spec("docx") is not None
+Document: Any = None
+Pt: Any = None
+Inches: Any = None
+WD_ALIGN_PARAGRAPH: Any = None
+OxmlElement: Any = None
+qn: Any = None
+
+
+def _ensure_docx_loaded() -> None:
+    """Import the python-docx names this module uses into its globals, once."""
+    global Document, Pt, Inches, WD_ALIGN_PARAGRAPH, OxmlElement, qn
+    if Document is not None:
+        return
     from docx import Document
     from docx.shared import Pt, Inches
     from docx.enum.text import WD_ALIGN_PARAGRAPH
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
-    # We don't need a fallback Document function since we'll check DOCX_AVAILABLE before using it
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+
+# Worker threads for reading scene translation files concurrently
+_LOAD_WORKERS = 8
+
+# Scene translation file names: act_<act>_scene_<scene>.json
+_SCENE_FILE_RE = re.compile(r'act_([^_]+)_scene_(\w+)\.json')
+
+
+class _WordCharTable(dict):
+    """str.translate table that deletes every character that is neither
+    alphanumeric nor whitespace. Entries are filled in the first time a
+    character is seen, so Unicode punctuation is handled like ASCII."""
+
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        char = chr(codepoint)
+        value = codepoint if char.isalnum() or char.isspace() else None
+        self[codepoint] = value
+        return value
+
+
+_WORD_CHARS = _WordCharTable()
+
+
+def _loads(data: bytes) -> Any:
+    """Parse UTF-8 JSON bytes, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _normalize_text(text: Optional[str]) -> str:
+    """Lowercase, remove punctuation and normalize whitespace for fuzzy matching."""
+    if text is None:
+        return ""
+    return ' '.join(text.lower().translate(_WORD_CHARS).split())
+
+
+def _normalized_modern_line(translation: Dict[str, Any]) -> Tuple[str, frozenset]:
+    """Normalized original_modern_line of a translation and its word set.
+
+    Computed once and cached on the translation dict, so the matching loop
+    does not re-normalize the same candidate for every dialogue line.
+    """
+    if "_norm_text" not in translation:
+        norm = _normalize_text(translation.get("original_modern_line"))
+        translation["_norm_text"] = norm
+        translation["_norm_words"] = frozenset(norm.split())
+    return translation["_norm_text"], translation["_norm_words"]
+
+
+def _format_references(translation: Dict[str, Any]) -> str:
+    """Text of a translation's References column, one reference per line."""
+    if "formatted_references" in translation:
+        return "\n".join(translation["formatted_references"])
+    if "references" in translation:
+        # Format the references if they haven't been pre-formatted
+        return "\n".join(
+            f"{ref.get('title', 'Unknown')} ({ref.get('act', '')}.{ref.get('scene', '')}.{ref.get('line', '')})"
+            for ref in translation["references"]
+        )
+    return ""
+
+
+def _build_word_index(scene_translations: List[Dict[str, Any]]) -> Tuple[Dict[str, List[int]], Dict[str, List[int]]]:
+    """Inverted indexes over a scene's translations for the match search.
+
+    Returns (word -> translation indices containing it, normalized text ->
+    translation indices with exactly that text); index lists are ascending.
+    """
+    postings: Dict[str, List[int]] = {}
+    by_text: Dict[str, List[int]] = {}
+    for i, t in enumerate(scene_translations):
+        if "original_modern_line" not in t:
+            continue
+        norm, words = _normalized_modern_line(t)
+        by_text.setdefault(norm, []).append(i)
+        for word in words:
+            postings.setdefault(word, []).append(i)
+    return postings, by_text
+
+
+def _match_candidates(
+    index: Tuple[Dict[str, List[int]], Dict[str, List[int]]],
+    line_norm: str,
+    line_words: frozenset,
+    start: int,
+    threshold: float
+) -> List[int]:
+    """Translation indices >= start that could match the line at threshold, ascending.
+
+    Short lines only match identical normalized text. For longer lines a
+    match needs Jaccard >= threshold, so it must share at least one of any
+    floor((1 - threshold) * len(line_words)) + 1 of the line's words; taking
+    the rarest ones keeps the candidate set small without missing a match.
+    """
+    postings, by_text = index
+    if len(line_norm) < 10:
+        candidates = by_text.get(line_norm, ())
+    else:
+        k = int((1 - threshold) * len(line_words) + 1e-9) + 1
+        rarest = sorted(line_words, key=lambda w: len(postings.get(w, ())))[:k]
+        candidates = set().union(*(postings.get(w, ()) for w in rarest))
+    return sorted(i for i in candidates if i >= start)
+
+@lru_cache(maxsize=128)
+def _load_translation_file(path: str, mtime_ns: int, size: int) -> Optional[List[Dict[str, Any]]]:
+    """Parse a scene translation file, normalize its modern lines and format its references.
+    
+    Memoized on the file's path, mtime and size, so generating several
+    documents from the same translations reads and prepares each file
+    once; editing the file changes the key and it is loaded again. The
+    returned list is shared between callers and must not be modified.
+    Returns None if the file has no "translated_lines".
+    """
+    with open(path, 'rb') as f:
+        data = _loads(f.read())
+    
+    if "translated_lines" not in data:
+        return None
+    translated_lines = data["translated_lines"]
+    for t in translated_lines:
+        if "original_modern_line" in t:
+            _normalized_modern_line(t)
+        t["_references_text"] = _format_references(t)
+    return translated_lines
+
 
 class FinalOutputGenerator:
     """
@@ -23,6 +173,10 @@ class FinalOutputGenerator:
     modern play structure with translated Shakespeare lines.
     """
     
+    # Saved blank document with the custom styles already added; every new
+    # document is loaded from it (see _new_document)
+    _template: Optional[bytes] = None
+    
     def __init__(self, logger: Optional[CustomLogger] = None):
         self.logger = logger or CustomLogger("FinalOutputGenerator")
         self.logger.info("Initializing FinalOutputGenerator")
@@ -31,11 +185,24 @@ class FinalOutputGenerator:
             self.logger.warning("python-docx is not installed. Install with: pip install python-docx")
         
         # Regular expressions for parsing markdown play files
-        self.act_pattern = re.compile(r'^ACT\s+([IVX\d]+)', re.IGNORECASE)
-        self.scene_pattern = re.compile(r'^SCENE\s+([IVX\d]+)', re.IGNORECASE)
-        self.stage_dir_pattern = re.compile(r'^\[(.*?)\]$')
+        # One pattern for every structural line: markdown act/scene headers
+        # ("# ACT I", "## SCENE 2"), legacy headers ("ACT I", "SCENE 2") and
+        # stage directions ("[Exit]"). The alternatives start differently, so
+        # at most one can match and m.lastgroup names it
+        self._line_re = re.compile(
+            r'^(?:#\s+ACT\s+(?P<md_act>\S+)'
+            r'|##\s+SCENE\s+(?P<md_scene>\S+)'
+            r'|ACT\s+(?P<act>[IVX\d]+)'
+            r'|SCENE\s+(?P<scene>[IVX\d]+)'
+            r'|\[(?P<stage>.*?)\]$)',
+            re.IGNORECASE
+        )
         self.character_pattern = re.compile(r'^([A-Z][A-Z\s\-\']+)$')
         
+        # Act/scene header offsets per play file, keyed by path and
+        # invalidated when the file's mtime or size changes
+        self._header_index_cache: Dict[str, Tuple[Tuple[int, int], List[Tuple[int, str, str]]]] = {}
+        
     def generate_final_document(
         self, 
         modern_play_path: str,
@@ -59,6 +226,7 @@ class FinalOutputGenerator:
         """
         if not DOCX_AVAILABLE:
             raise ImportError("python-docx is required for generating Word documents. Install with: pip install python-docx")
+        _ensure_docx_loaded()
             
         self.logger.info(f"Generating final document from {modern_play_path}")
         
@@ -78,16 +246,13 @@ class FinalOutputGenerator:
         )
         self.logger.info(f"Loaded translations for {len(translations)} scenes")
         
-        # Create the document
-        doc = Document()
+        # Create the document (styles come from the template)
+        doc = self._new_document()
         
         # Set document properties
         doc.core_properties.title = "Shakespeare Translation" 
         doc.core_properties.author = "AI Translation System"
         
-        # Set up styles
-        self._setup_document_styles(doc)
-        
         # Add title based on scope
         title_text = "Shakespeare Translation"
         if specific_act:
@@ -140,13 +305,12 @@ class FinalOutputGenerator:
             
             if filepath.exists():
                 try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
+                    translated_lines = self._read_translated_lines(filepath)
                     
                     # Extract the translated lines
-                    if "translated_lines" in data:
-                        translations[(specific_act.lower(), specific_scene.lower())] = data["translated_lines"]
-                        self.logger.debug(f"Loaded {len(data['translated_lines'])} translated lines for Act {specific_act}, Scene {specific_scene}")
+                    if translated_lines is not None:
+                        translations[(specific_act.lower(), specific_scene.lower())] = translated_lines
+                        self.logger.debug(f"Loaded {len(translated_lines)} translated lines for Act {specific_act}, Scene {specific_scene}")
                 except Exception as e:
                     self.logger.error(f"Error loading specific translation file {filepath}: {e}")
             else:
@@ -154,33 +318,85 @@ class FinalOutputGenerator:
             
             return translations
             
-        # Load all relevant translation files
-        for filepath in Path(translations_dir).glob("*.json"):
-            match = re.match(r'act_([^_]+)_scene_(\w+)\.json', filepath.name)
+        # Collect all relevant translation files
+        scene_files = []
+        try:
+            with os.scandir(translations_dir) as it:
+                entries = list(it)
+        except OSError as e:
+            self.logger.warning(f"Cannot list translations directory {translations_dir}: {e}")
+            entries = []
+            
+        # With a specific act, only names starting act_<act>_scene_ (any case
+        # for the act) can match, so other files are skipped before the regex
+        prefix = f"act_{specific_act.lower()}_scene_" if specific_act else ""
+        
+        for entry in entries:
+            name = entry.name
+            if not name.endswith(".json") or (prefix and name[:len(prefix)].lower() != prefix):
+                continue
+            if not entry.is_file():
+                continue
+            match = _SCENE_FILE_RE.match(name)
             if not match:
-                self.logger.warning(f"Skipping file with non-matching pattern: {filepath.name}")
+                self.logger.warning(f"Skipping file with non-matching pattern: {name}")
                 continue
                 
             act, scene = match.groups()
-            
-            # Filter by specific act if provided
-            if specific_act and act.lower() != specific_act.lower():
-                continue
-                
+            scene_files.append((entry.path, act, scene))
+        
+        def load(filepath):
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                # Extract the translated lines
-                if "translated_lines" in data:
-                    translations[(act, scene)] = data["translated_lines"]
-                    self.logger.debug(f"Loaded {len(data['translated_lines'])} translated lines for Act {act}, Scene {scene}")
+                return self._read_translated_lines(filepath), None
             except Exception as e:
-                self.logger.error(f"Error loading translation file {filepath}: {e}")
+                return None, e
+        
+        # Scene files are small and independent, so read them concurrently
+        if len(scene_files) > 1:
+            with ThreadPoolExecutor(max_workers=min(_LOAD_WORKERS, len(scene_files))) as executor:
+                results = list(executor.map(load, [filepath for filepath, _, _ in scene_files]))
+        else:
+            results = [load(filepath) for filepath, _, _ in scene_files]
+        
+        for (filepath, act, scene), (translated_lines, error) in zip(scene_files, results):
+            if error is not None:
+                self.logger.error(f"Error loading translation file {filepath}: {error}")
+                continue
+                
+            # Extract the translated lines
+            if translated_lines is not None:
+                translations[(act, scene)] = translated_lines
+                self.logger.debug(f"Loaded {len(translated_lines)} translated lines for Act {act}, Scene {scene}")
                 
         return translations
         
-    def _setup_document_styles(self, doc) -> None:
+    def _read_translated_lines(self, filepath) -> Optional[List[Dict[str, Any]]]:
+        """Read one scene translation file and prepare its translated lines.
+        
+        Returns None if the file has no "translated_lines"; read and parse
+        errors are raised to the caller. Results are cached until the file
+        changes (see _load_translation_file).
+        """
+        st = os.stat(filepath)
+        return _load_translation_file(os.fspath(filepath), st.st_mtime_ns, st.st_size)
+        
+    @classmethod
+    def _new_document(cls):
+        """Create a blank document that already has the Act, Scene, etc. styles.
+        
+        The styles are set up once on a template document, which is saved and
+        cached on the class; each call loads a fresh document from those bytes.
+        """
+        if cls._template is None:
+            doc = Document()
+            cls._setup_document_styles(doc)
+            buffer = BytesIO()
+            doc.save(buffer)
+            cls._template = buffer.getvalue()
+        return Document(BytesIO(cls._template))
+        
+    @staticmethod
+    def _setup_document_styles(doc) -> None:
         """Set up styles for the document."""
         # Act style
         act_style = doc.styles.add_style('Act', 1)
@@ -213,6 +429,141 @@ class FinalOutputGenerator:
         dialogue_style.paragraph_format.space_before = Pt(0)
         dialogue_style.paragraph_format.space_after = Pt(12)
         
+    @staticmethod
+    def _resolve_styles(doc) -> Dict[str, Any]:
+        """Look up the styles used while writing a document once, by name.
+        
+        Assigning style objects skips python-docx's by-name style search on
+        every paragraph and table.
+        """
+        return {name: doc.styles[name]
+                for name in ('Act', 'Scene', 'StageDirection', 'Character', 'Dialogue', 'Table Grid')}
+        
+    @staticmethod
+    def _dialogue_row_template(dialogue_style_id: str):
+        """A <w:tr> of three fixed-width cells, each holding one empty run in a Dialogue paragraph."""
+        tr = OxmlElement('w:tr')
+        for width in (Inches(2.5), Inches(2.0), Inches(2.5)):
+            tcPr = OxmlElement('w:tcPr')
+            tcPr.append(OxmlElement('w:tcW', {qn('w:type'): 'dxa', qn('w:w'): str(width.twips)}))
+            pPr = OxmlElement('w:pPr')
+            pPr.append(OxmlElement('w:pStyle', {qn('w:val'): dialogue_style_id}))
+            p = OxmlElement('w:p')
+            p.append(pPr)
+            p.append(OxmlElement('w:r'))
+            tc = OxmlElement('w:tc')
+            tc.append(tcPr)
+            tc.append(p)
+            tr.append(tc)
+        return tr
+        
+    @staticmethod
+    def _make_row(template, texts: Tuple[str, str, str]):
+        """Copy the row template and fill in the text of its three cells."""
+        tr = deepcopy(template)
+        for r, text in zip(tr.iter(qn('w:r')), texts):
+            # CT_R.text turns "\n" and "\t" into <w:br/> and <w:tab/> like Cell.text does
+            r.text = text
+        return tr
+        
+    def _add_dialogue_table(self, doc, rows: List[Tuple[str, str, str]], styles: Dict[str, Any]) -> None:
+        """Add one table holding a (Shakespeare, References, Modern) row per dialogue line.
+        
+        Rows are built as XML and appended to the table element directly,
+        avoiding python-docx's per-cell text, width and style setters.
+        """
+        table = doc.add_table(rows=0, cols=3)
+        table.style = styles['Table Grid']
+        template = self._dialogue_row_template(styles['Dialogue'].style_id)
+        
+        tbl = table._tbl
+        for texts in rows:
+            tbl.append(self._make_row(template, texts))
+        
+    def _index_headers(self, filepath: str) -> List[Tuple[int, str, str]]:
+        """Byte offset, kind ("act" or "scene") and value of every header line in a play file.
+        
+        Recognizes the same markdown and legacy headers as _process_play_file.
+        The index is cached per file until its mtime or size changes, so
+        generating several scenes of one play scans the file once.
+        """
+        st = os.stat(filepath)
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._header_index_cache.get(filepath)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        
+        headers: List[Tuple[int, str, str]] = []
+        offset = 0
+        with open(filepath, 'rb') as f:
+            for raw in f:
+                line = raw.decode('utf-8').strip()
+                match = self._line_re.match(line) if line else None
+                if match and match.lastgroup != "stage":
+                    kind = match.lastgroup
+                    value = match.group(kind)
+                    if kind == "md_act":
+                        headers.append((offset, "act", value.upper()))
+                    elif kind == "md_scene":
+                        headers.append((offset, "scene", value.upper()))
+                    else:
+                        headers.append((offset, kind, value))
+                offset += len(raw)
+        
+        self._header_index_cache[filepath] = (stamp, headers)
+        return headers
+        
+    def _section_ranges(
+        self,
+        filepath: str,
+        specific_act: str,
+        specific_scene: Optional[str] = None
+    ) -> List[Tuple[int, Optional[int]]]:
+        """(start, end) byte ranges of the play file covering an act or one of its scenes.
+        
+        For an act the range runs from its header to the next act header.
+        For a scene it is the act header line plus any lines before the act's
+        first scene, followed by the scene itself. An end of None means EOF.
+        """
+        headers = self._index_headers(filepath)
+        act_lower = specific_act.lower()
+        scene_lower = specific_scene.lower() if specific_scene else None
+        ranges: List[Tuple[int, Optional[int]]] = []
+        
+        for i, (offset, kind, value) in enumerate(headers):
+            if kind != "act" or value.lower() != act_lower:
+                continue
+            # Headers up to the next act belong to this act
+            j = i + 1
+            while j < len(headers) and headers[j][1] != "act":
+                j += 1
+            act_end = headers[j][0] if j < len(headers) else None
+            
+            if scene_lower is None:
+                ranges.append((offset, act_end))
+                continue
+            
+            first_scene = headers[i + 1][0] if i + 1 < j else act_end
+            ranges.append((offset, first_scene))
+            for k in range(i + 1, j):
+                if headers[k][2].lower() == scene_lower:
+                    ranges.append((headers[k][0], headers[k + 1][0] if k + 1 < len(headers) else None))
+        
+        return ranges
+        
+    @staticmethod
+    def _read_sections(play_file: BinaryIO, ranges: List[Tuple[int, Optional[int]]]):
+        """Yield the decoded lines of a binary play file that fall inside the given byte ranges."""
+        for start, end in ranges:
+            play_file.seek(start)
+            position = start
+            while end is None or position < end:
+                raw = play_file.readline()
+                if not raw:
+                    break
+                position += len(raw)
+                yield raw.decode('utf-8')
+        
     def _process_play_file(
         self, 
         doc, 
@@ -228,55 +579,19 @@ class FinalOutputGenerator:
         """
         self.logger.info(f"Processing modern play file: {filepath}")
         
-        # Function for fuzzy text matching
-        def fuzzy_match(text1, text2, threshold=0.75):
-            # Normalize texts for comparison
-            def normalize(text):
-                if text is None:
-                    return ""
-                # Convert to lowercase
-                text = text.lower()
-                # Remove punctuation
-                text = ''.join(c for c in text if c.isalnum() or c.isspace())
-                # Normalize whitespace
-                text = ' '.join(text.split())
-                return text
-                
-            norm1 = normalize(text1)
-            norm2 = normalize(text2)
-            
+        # Similarity of two pre-normalized texts given their word sets
+        def similarity(norm1, words1, norm2, words2):
             # For very short texts, require exact match after normalization
             if len(norm1) < 10 or len(norm2) < 10:
-                return norm1 == norm2
+                return 1.0 if norm1 == norm2 else 0.0
                 
-            # Simple similarity ratio
             # Count shared words
-            words1 = set(norm1.split())
-            words2 = set(norm2.split())
-            common_words = words1.intersection(words2)
+            common = len(words1 & words2)
             
             # Calculate Jaccard similarity
             if len(words1) + len(words2) == 0:
-                return False
-            similarity = len(common_words) / (len(words1) + len(words2) - len(common_words))
-            
-            return similarity >= threshold
-        
-        # Function to detect markdown headers and extract act/scene info
-        def parse_markdown_header(line):
-            # Check for markdown act header (# ACT X)
-            if line.startswith("# ") and "ACT" in line.upper():
-                parts = line.upper().replace("#", "").strip().split()
-                if len(parts) >= 2 and parts[0] == "ACT":
-                    return "act", parts[1]
-            
-            # Check for markdown scene header (## SCENE X)
-            if line.startswith("## ") and "SCENE" in line.upper():
-                parts = line.upper().replace("#", "").strip().split()
-                if len(parts) >= 2 and parts[0] == "SCENE":
-                    return "scene", parts[1]
-                    
-            return None, None
+                return 0.0
+            return common / (len(words1) + len(words2) - common)
         
         # Function to detect character names more robustly, excluding markdown headers
         def is_character_line(line):
@@ -285,15 +600,17 @@ class FinalOutputGenerator:
                 return False
                 
             # If it's in all caps and not too long, it's likely a character name
-            if line.isupper() and len(line.split()) <= 4:
-                return True
-                
-            # Check against the character pattern
-            if self.character_pattern.match(line):
-                return True
+            if line.isupper():
+                if len(line.split()) <= 4:
+                    return True
+                    
+                # Check against the character pattern. Anything it matches is
+                # all caps, so mixed-case dialogue never needs the regex.
+                if self.character_pattern.match(line):
+                    return True
                 
             # Additional checks (e.g., names might be followed by a colon)
-            if ":" in line and line.split(":")[0].strip().isupper():
+            if ":" in line and line.partition(":")[0].strip().isupper():
                 return True
                 
             return False
@@ -303,269 +620,269 @@ class FinalOutputGenerator:
         current_scene = None
         current_character = None
         
+        # Lowercased act/scene, used as translation keys and for comparisons;
+        # kept in step with current_act/current_scene so they are lowered once.
+        # Header values are interned, so every (act, scene) key built from them
+        # refers to the same string objects and compares by identity first
+        current_act_l = ""
+        current_scene_l = ""
+        specific_act_l = specific_act.lower() if specific_act else ""
+        specific_scene_l = specific_scene.lower() if specific_scene else ""
+        
         # Track whether we're in the target section for specific processing
         in_target_section = specific_act is None  # Initially true if processing everything
         
         # Keep track of translation indices for each scene
         translation_indices = {}  # (act, scene) -> current index
         
-        # Read the file
+        # Word indexes for the match search, built per scene on first use
+        scene_word_indexes = {}  # (act, scene) -> _build_word_index(...)
+        
+        # Open the file; lines are read one at a time below. When only one act
+        # or scene is wanted, seek straight to its lines instead of filtering
+        # every line of the play
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
+            if specific_act:
+                ranges = self._section_ranges(filepath, specific_act, specific_scene)
+                play_file = open(filepath, 'rb')
+                play_lines = self._read_sections(play_file, ranges)
+            else:
+                play_file = open(filepath, 'r', encoding='utf-8')
+                play_lines = play_file
         except Exception as e:
             self.logger.error(f"Error reading modern play file: {e}")
             return
         
+        # Dialogue rows waiting to be written as one table; flushed whenever a
+        # non-dialogue paragraph is added and at the end of the file, so each
+        # run of consecutive dialogue lines becomes a single multi-row table
+        pending_rows: List[Tuple[str, str, str]] = []
+        styles = self._resolve_styles(doc)
+        
+        def flush_dialogue_rows():
+            if pending_rows:
+                self._add_dialogue_table(doc, pending_rows, styles)
+                pending_rows.clear()
+        
+        def add_paragraph(text, style):
+            flush_dialogue_rows()
+            return doc.add_paragraph(text, style=styles[style])
+        
+        line_re = self._line_re
+        
         # Process each line
-        for line_num, line in enumerate(lines):
-            line = line.strip()
-            if not line:
-                continue
-            
-            # IMPROVED HEADER DETECTION FOR MARKDOWN
-            header_type, header_value = parse_markdown_header(line)
-            
-            # Handle markdown act header
-            if header_type == "act":
-                current_act = header_value
-                current_scene = None
-                
-                self.logger.info(f"Detected markdown Act header: {line} -> Act {current_act}")
-                
-                # Check if this is the specific act we're looking for
-                if specific_act:
-                    # Add null check before using lower()
-                    act_lower = current_act.lower() if current_act is not None else ""
-                    specific_act_lower = specific_act.lower() if specific_act is not None else ""
-                    in_target_section = act_lower == specific_act_lower
-                    if not in_target_section:
-                        self.logger.debug(f"Skipping Act {current_act} (not in target)")
-                        continue
-                
-                # Add act header to document
-                if in_target_section:
-                    # Use string conversion to handle potential None values
-                    act_para = doc.add_paragraph("ACT " + str(current_act), style='Act')
-                    self.logger.debug(f"Added Act {current_act}")
-                
-                continue
-
-            # For scene headers
-            if header_type == "scene":
-                current_scene = header_value
-                
-                self.logger.info(f"Detected markdown Scene header: {line} -> Scene {current_scene}")
-                
-                # Reset translation index for new scene
-                act_key = current_act.lower() if current_act is not None else ""
-                scene_key = current_scene.lower() if current_scene is not None else ""
-                translation_indices[(act_key, scene_key)] = 0
-                
-                # Check if this is the specific scene we're looking for
-                if specific_scene and specific_act:
-                    # Add null check before using lower()
-                    scene_lower = current_scene.lower() if current_scene is not None else ""
-                    specific_scene_lower = specific_scene.lower() if specific_scene is not None else ""
-                    in_target_section = scene_lower == specific_scene_lower
-                    if not in_target_section:
-                        self.logger.debug(f"Skipping Scene {current_scene} (not in target)")
-                        continue
-                
-                # Add scene header to document if we're processing this section
-                if in_target_section:
-                    # Use string conversion to handle potential None values
-                    scene_para = doc.add_paragraph("SCENE " + str(current_scene), style='Scene')
-                    self.logger.debug(f"Added Scene {current_scene}")
-                
-                continue
-
-            # LEGACY ACT/SCENE DETECTION (for non-markdown format)
-            act_match = self.act_pattern.match(line) if hasattr(self, 'act_pattern') else None
-            if act_match:
-                current_act = act_match.group(1)
-                current_scene = None
-                
-                # Check if this is the specific act we're looking for
-                if specific_act:
-                    in_target_section = current_act.lower() == specific_act.lower()
-                    if not in_target_section:
-                        self.logger.debug(f"Skipping Act {current_act} (not in target)")
-                        continue
-                
-                # Add act header to document
-                if in_target_section:
-                    act_para = doc.add_paragraph("ACT " + current_act, style='Act')
-                    self.logger.debug(f"Added Act {current_act}")
-                
-                continue
-                
-            # Skip if we're not in the target act
-            if specific_act and not in_target_section:
-                continue
-                
-            scene_match = self.scene_pattern.match(line) if hasattr(self, 'scene_pattern') else None
-            if scene_match:
-                current_scene = scene_match.group(1)
-                
-                # Reset translation index for new scene
-                act_key = current_act.lower() if current_act is not None else ""
-                scene_key = current_scene.lower() if current_scene is not None else ""
-                translation_indices[(act_key, scene_key)] = 0
-                
-                # Check if this is the specific scene we're looking for
-                if specific_scene and specific_act:
-                    # Only process the specific scene in the specific act
-                    in_target_section = (current_scene.lower() == specific_scene.lower())
-                    if not in_target_section:
-                        self.logger.debug(f"Skipping Scene {current_scene} (not in target)")
-                        continue
-                
-                # Add scene header to document if we're processing this section
-                if in_target_section:
-                    scene_para = doc.add_paragraph("SCENE " + current_scene, style='Scene')
-                    self.logger.debug(f"Added Scene {current_scene}")
-                
-                continue
+        with play_file:
+            for line_num, line in enumerate(play_lines):
+                line = line.strip()
+                if not line:
+                    continue
                 
-            # Skip if we're not in the target scene
-            if specific_scene and specific_act and not in_target_section:
-                continue
+                # Classify headers and stage directions with a single match
+                match = line_re.match(line)
+                kind = match.lastgroup if match else None
                 
-            # Process structural and dialogue lines if we're in the target section
-            if in_target_section:
-                # Check if it's a stage direction
-                stage_dir_match = self.stage_dir_pattern.match(line)
-                if stage_dir_match:
-                    direction = stage_dir_match.group(1)
+                # Handle markdown act header
+                if kind == "md_act":
+                    current_act = sys.intern(match.group("md_act").upper())
+                    current_act_l = sys.intern(current_act.lower())
+                    current_scene = None
+                    current_scene_l = ""
+                    
+                    self.logger.info(f"Detected markdown Act header: {line} -> Act {current_act}")
+                    
+                    # Check if this is the specific act we're looking for
+                    if specific_act:
+                        in_target_section = current_act_l == specific_act_l
+                        if not in_target_section:
+                            self.logger.debug(f"Skipping Act {current_act} (not in target)")
+                            continue
+                    
+                    # Add act header to document
+                    if in_target_section:
+                        # Use string conversion to handle potential None values
+                        act_para = add_paragraph("ACT " + str(current_act), style='Act')
+                        self.logger.debug(f"Added Act {current_act}")
                     
-                    # Add stage direction to document
-                    direction_para = doc.add_paragraph(f"[{direction}]", style='StageDirection')
-                    self.logger.debug(f"Added stage direction: [{direction}]")
                     continue
+
+                # For scene headers
+                if kind == "md_scene":
+                    current_scene = sys.intern(match.group("md_scene").upper())
+                    current_scene_l = sys.intern(current_scene.lower())
                     
-                # IMPROVED CHARACTER DETECTION
-                if is_character_line(line):
-                    # Extract character name (remove any colon)
-                    if ":" in line:
-                        current_character = line.split(":")[0].strip()
-                    else:
-                        current_character = line.strip()
+                    self.logger.info(f"Detected markdown Scene header: {line} -> Scene {current_scene}")
+                    
+                    # Reset translation index for new scene
+                    translation_indices[(current_act_l, current_scene_l)] = 0
+                    
+                    # Check if this is the specific scene we're looking for
+                    if specific_scene and specific_act:
+                        in_target_section = current_scene_l == specific_scene_l
+                        if not in_target_section:
+                            self.logger.debug(f"Skipping Scene {current_scene} (not in target)")
+                            continue
+                    
+                    # Add scene header to document if we're processing this section
+                    if in_target_section:
+                        # Use string conversion to handle potential None values
+                        scene_para = add_paragraph("SCENE " + str(current_scene), style='Scene')
+                        self.logger.debug(f"Added Scene {current_scene}")
                     
-                    # Add character name to document
-                    char_para = doc.add_paragraph(current_character, style='Character')
-                    self.logger.debug(f"Added character: {current_character}")
                     continue
+
+                # LEGACY ACT/SCENE DETECTION (for non-markdown format)
+                if kind == "act":
+                    current_act = sys.intern(match.group("act"))
+                    current_act_l = sys.intern(current_act.lower())
+                    current_scene = None
+                    current_scene_l = ""
                     
-                # If it's none of the above, it's a dialogue line
-                if current_character and current_act is not None and current_scene is not None:
-                    # Get normalized act and scene keys
-                    act_key = current_act.lower() if current_act is not None else ""
-                    scene_key = current_scene.lower() if current_scene is not None else ""
+                    # Check if this is the specific act we're looking for
+                    if specific_act:
+                        in_target_section = current_act_l == specific_act_l
+                        if not in_target_section:
+                            self.logger.debug(f"Skipping Act {current_act} (not in target)")
+                            continue
                     
-                    self.logger.debug(f"Processing dialogue in act_{act_key}_scene_{scene_key}")
+                    # Add act header to document
+                    if in_target_section:
+                        act_para = add_paragraph("ACT " + current_act, style='Act')
+                        self.logger.debug(f"Added Act {current_act}")
                     
-                    # Find matching translation by modern content
-                    translation = None
-                    search_window = 8  # Increased window size for better matching
+                    continue
                     
-                    # Look up translations for this act and scene
-                    scene_translations = translations.get((act_key, scene_key), [])
-                    current_index = translation_indices.get((act_key, scene_key), 0)
+                # Skip if we're not in the target act
+                if specific_act and not in_target_section:
+                    continue
                     
-                    # Log some stats
-                    self.logger.debug(f"Act {current_act}, Scene {current_scene}: Searching for match at index {current_index}/{len(scene_translations)}")
+                if kind == "scene":
+                    current_scene = sys.intern(match.group("scene"))
+                    current_scene_l = sys.intern(current_scene.lower())
                     
-                    if scene_translations and current_index < len(scene_translations):
-                        # Look for an exact or fuzzy match in the next few translations
-                        search_end = min(current_index + search_window, len(scene_translations))
-                        
-                        for i in range(current_index, search_end):
-                            t = scene_translations[i]
-                            if "original_modern_line" in t:
-                                modern_line = t["original_modern_line"]
-                                
-                                # Try fuzzy matching
-                                if fuzzy_match(modern_line, line):
-                                    translation = t
-                                    # Update the index for next time
-                                    translation_indices[(act_key, scene_key)] = i + 1
-                                    self.logger.debug(f"Found fuzzy match at index {i}: '{modern_line[:30]}...' ≈ '{line[:30]}...'")
-                                    break
+                    # Reset translation index for new scene
+                    translation_indices[(current_act_l, current_scene_l)] = 0
                     
-                    # If no match found in window, try a broader search as fallback
-                    if translation is None and scene_translations:
-                        self.logger.debug(f"No match in window, trying broader search for: '{line[:30]}...'")
-                        
-                        # Look through all remaining translations
-                        for i in range(current_index, len(scene_translations)):
-                            t = scene_translations[i]
-                            if "original_modern_line" in t:
-                                modern_line = t["original_modern_line"]
-                                
-                                # Try fuzzy matching with lower threshold for the last act
-                                threshold = 0.6 if act_key.lower() == "v" else 0.75
-                                if fuzzy_match(modern_line, line, threshold):
-                                    translation = t
-                                    # Update the index for next time
-                                    translation_indices[(act_key, scene_key)] = i + 1
-                                    self.logger.debug(f"Found fuzzy match at index {i}: '{modern_line[:30]}...' ≈ '{line[:30]}...'")
-                                    break
+                    # Check if this is the specific scene we're looking for
+                    if specific_scene and specific_act:
+                        # Only process the specific scene in the specific act
+                        in_target_section = current_scene_l == specific_scene_l
+                        if not in_target_section:
+                            self.logger.debug(f"Skipping Scene {current_scene} (not in target)")
+                            continue
+                    
+                    # Add scene header to document if we're processing this section
+                    if in_target_section:
+                        scene_para = add_paragraph("SCENE " + current_scene, style='Scene')
+                        self.logger.debug(f"Added Scene {current_scene}")
                     
-                    # Create a table for this line (Shakespeare | References | Modern)
-                    table = doc.add_table(rows=1, cols=3)
-                    table.style = 'Table Grid'
+                    continue
                     
-                    # Set column widths if there are columns to set widths for
-                    if hasattr(table, 'columns') and len(table.columns) >= 3:
-                        for i, width in enumerate([2.5, 2.0, 2.5]):
-                            # Make sure we have cells in this column before iterating
-                            col = table.columns[i]
-                            if hasattr(col, 'cells') and len(col.cells) > 0:
-                                for cell in col.cells:
-                                    cell.width = Inches(width)
+                # Skip if we're not in the target scene
+                if specific_scene and specific_act and not in_target_section:
+                    continue
                     
-                    # Make sure the table has rows before trying to access them
-                    if hasattr(table, 'rows') and len(table.rows) > 0:
-                        # Get first row cells
-                        row = table.rows[0]
-                        if hasattr(row, 'cells') and len(row.cells) >= 3:
-                            cells = row.cells
+                # Process structural and dialogue lines if we're in the target section
+                if in_target_section:
+                    # Check if it's a stage direction
+                    if kind == "stage":
+                        direction = match.group("stage")
+                        
+                        # Add stage direction to document
+                        direction_para = add_paragraph(f"[{direction}]", style='StageDirection')
+                        self.logger.debug(f"Added stage direction: [{direction}]")
+                        continue
+                        
+                    # IMPROVED CHARACTER DETECTION
+                    if is_character_line(line):
+                        # Extract character name (remove any colon)
+                        if ":" in line:
+                            current_character = line.split(":")[0].strip()
+                        else:
+                            current_character = line.strip()
+                        # Names repeat throughout the play; keep one string per name
+                        current_character = sys.intern(current_character)
+                        
+                        # Add character name to document
+                        char_para = add_paragraph(current_character, style='Character')
+                        self.logger.debug(f"Added character: {current_character}")
+                        continue
+                        
+                    # If it's none of the above, it's a dialogue line
+                    if current_character and current_act is not None and current_scene is not None:
+                        act_key = current_act_l
+                        scene_key = current_scene_l
+                        
+                        self.logger.debug(f"Processing dialogue in act_{act_key}_scene_{scene_key}")
+                        
+                        # Find matching translation by modern content
+                        translation = None
+                        search_window = 8  # Increased window size for better matching
+                        
+                        # Look up translations for this act and scene
+                        scene_translations = translations.get((act_key, scene_key), [])
+                        current_index = translation_indices.get((act_key, scene_key), 0)
+                        
+                        # Log some stats
+                        self.logger.debug(f"Act {current_act}, Scene {current_scene}: Searching for match at index {current_index}/{len(scene_translations)}")
+                        
+                        # Normalize the dialogue line once for every candidate comparison
+                        line_norm = _normalize_text(line)
+                        line_words = frozenset(line_norm.split())
+                        
+                        if scene_translations:
+                            # A match within the next search_window translations
+                            # needs similarity >= 0.75; past the window, the first
+                            # translation at the broader threshold (lower for the
+                            # last act) wins. The broader threshold also applies
+                            # inside the window when nothing there reaches 0.75,
+                            # so one walk over the candidates covers both
+                            search_end = current_index + search_window
+                            threshold = 0.6 if act_key == "v" else 0.75
+                            match_index = -1
                             
-                            # Column 1: Shakespeare text or placeholder
-                            if translation and "text" in translation:
-                                cells[0].text = translation["text"]
-                            else:
-                                cells[0].text = "[No translation available]"
-                                self.logger.warning(f"No translation match found for: '{line[:50]}...'")
-                                
-                            # Column 2: References
-                            if translation and "formatted_references" in translation:
-                                cells[1].text = "\n".join(translation["formatted_references"])
-                            elif translation and "references" in translation:
-                                # Format the references if they haven't been pre-formatted
-                                formatted_refs = []
-                                for ref in translation["references"]:
-                                    title = ref.get("title", "Unknown")
-                                    act_ref = ref.get("act", "")
-                                    scene_ref = ref.get("scene", "")
-                                    line_ref = ref.get("line", "")
-                                    formatted_refs.append(f"{title} ({act_ref}.{scene_ref}.{line_ref})")
-                                cells[1].text = "\n".join(formatted_refs)
-                            else:
-                                cells[1].text = ""
-                                
-                            # Column 3: Modern text
-                            cells[2].text = line
+                            word_index = scene_word_indexes.get((act_key, scene_key))
+                            if word_index is None:
+                                word_index = _build_word_index(scene_translations)
+                                scene_word_indexes[(act_key, scene_key)] = word_index
                             
-                            # Format the table
-                            for cell in row.cells:
-                                if hasattr(cell, 'paragraphs'):
-                                    for paragraph in cell.paragraphs:
-                                        paragraph.style = 'Dialogue'
-                    
-                    self.logger.debug(f"Added dialogue line table for: {line[:30]}...")
-        
+                            # Only translations sharing enough words can reach the threshold
+                            for i in _match_candidates(word_index, line_norm, line_words, current_index, threshold):
+                                if i >= search_end and match_index >= 0:
+                                    break
+                                sim = similarity(*_normalized_modern_line(scene_translations[i]), line_norm, line_words)
+                                if i < search_end:
+                                    if sim >= 0.75:
+                                        match_index = i
+                                        break
+                                    if match_index < 0 and sim >= threshold:
+                                        match_index = i
+                                elif sim >= threshold:
+                                    match_index = i
+                                    break
+                            
+                            if match_index >= 0:
+                                translation = scene_translations[match_index]
+                                # Update the index for next time
+                                translation_indices[(act_key, scene_key)] = match_index + 1
+                                self.logger.debug(f"Found fuzzy match at index {match_index}: '{translation['original_modern_line'][:30]}...' ≈ '{line[:30]}...'")
+                        
+                        # Queue a row for this line (Shakespeare | References | Modern)
+                        # Column 1: Shakespeare text or placeholder
+                        if translation and "text" in translation:
+                            shakespeare_text = translation["text"]
+                        else:
+                            shakespeare_text = "[No translation available]"
+                            self.logger.warning(f"No translation match found for: '{line[:50]}...'")
+                            
+                        # Column 2: References (formatted when the scene was loaded)
+                        references_text = translation["_references_text"] if translation else ""
+                        
+                        # Column 3: Modern text
+                        pending_rows.append((shakespeare_text, references_text, line))
+                        
+                        self.logger.debug(f"Queued dialogue line row for: {line[:30]}...")
+            
+        flush_dialogue_rows()
         self.logger.info("Completed processing play file")
 
     def generate_scene_document(
@@ -627,17 +944,15 @@ class FinalOutputGenerator:
         """
         if not DOCX_AVAILABLE:
             raise ImportError("python-docx is required for generating Word documents. Install with: pip install python-docx")
+        _ensure_docx_loaded()
             
-        # Create the document
-        doc = Document()
+        # Create the document (styles come from the template)
+        doc = self._new_document()
         
         # Set document properties
         doc.core_properties.title = f"Shakespeare Translation - Act {act}, Scene {scene} (Excerpt)"
         doc.core_properties.author = "AI Translation System"
         
-        # Set up styles
-        self._setup_document_styles(doc)
-        
         # Add title
         title = doc.add_heading(f"Shakespeare Translation - Act {act}, Scene {scene} (Excerpt)", level=0)
         title.alignment = WD_ALIGN_PARAGRAPH.CENTER
@@ -646,61 +961,28 @@ class FinalOutputGenerator:
         doc.add_paragraph(f"ACT {act}", style='Act')
         doc.add_paragraph(f"SCENE {scene}", style='Scene')
         
-        # Process the lines
+        # Process the lines into (Shakespeare | References | Modern) rows
+        rows = []
         for i, modern_line in enumerate(modern_lines):
             # Get the corresponding translation if available
             translation = None
             if i < len(translated_lines):
                 translation = translated_lines[i]
             
-            # Create a table for this line
-            table = doc.add_table(rows=1, cols=3)
-            table.style = 'Table Grid'
-            
-            # Set column widths if we can
-            if hasattr(table, 'columns') and len(table.columns) >= 3:
-                for i, width in enumerate([2.5, 2.0, 2.5]):
-                    col = table.columns[i]
-                    if hasattr(col, 'cells') and len(col.cells) > 0:
-                        for cell in col.cells:
-                            cell.width = Inches(width)
-            
-            # Make sure the table has rows before trying to access them
-            if hasattr(table, 'rows') and len(table.rows) > 0:
-                row = table.rows[0]
-                if hasattr(row, 'cells') and len(row.cells) >= 3:
-                    cells = row.cells
-                    
-                    # Column 1: Shakespeare text or placeholder
-                    if translation and "text" in translation:
-                        cells[0].text = translation["text"]
-                    else:
-                        cells[0].text = "[No translation available]"
-                        
-                    # Column 2: References
-                    if translation and "formatted_references" in translation:
-                        cells[1].text = "\n".join(translation["formatted_references"])
-                    elif translation and "references" in translation:
-                        # Format the references if they haven't been pre-formatted
-                        formatted_refs = []
-                        for ref in translation["references"]:
-                            title = ref.get("title", "Unknown")
-                            act_ref = ref.get("act", "")
-                            scene_ref = ref.get("scene", "")
-                            line_ref = ref.get("line", "")
-                            formatted_refs.append(f"{title} ({act_ref}.{scene_ref}.{line_ref})")
-                        cells[1].text = "\n".join(formatted_refs)
-                    else:
-                        cells[1].text = ""
-                        
-                    # Column 3: Modern text
-                    cells[2].text = modern_line
-                    
-                    # Format the table
-                    for cell in row.cells:
-                        if hasattr(cell, 'paragraphs'):
-                            for paragraph in cell.paragraphs:
-                                paragraph.style = 'Dialogue'
+            # Column 1: Shakespeare text or placeholder
+            if translation and "text" in translation:
+                shakespeare_text = translation["text"]
+            else:
+                shakespeare_text = "[No translation available]"
+                
+            # Column 2: References
+            references_text = _format_references(translation) if translation else ""
+                
+            # Column 3: Modern text
+            rows.append((shakespeare_text, references_text, modern_line))
+        
+        if rows:
+            self._add_dialogue_table(doc, rows, self._resolve_styles(doc))
         
         # Save the document
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -3,11 +3,84 @@
 import os
 import json
 import argparse
+from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Union, cast, TextIO, BinaryIO
+from typing import List, Dict, Any, Iterator, NamedTuple, Optional, Tuple, Union, cast, TextIO, BinaryIO
 
 import re
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# str.translate tables for escaping cell text in one pass: markdown cells
+# keep each row on one line and escape the table's pipe delimiters; HTML
+# cells escape "&" too, so text such as "&lt;" or "AT&T" survives as written
+_MD_CELL_ESCAPE = str.maketrans({"\n": " ", "|": "\\|"})
+_MD_PIPE_ESCAPE = str.maketrans({"|": "\\|"})
+_HTML_ESCAPE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+# One table row of the markdown and HTML output, formatted once per line
+_MD_ROW = "| {s} | {r} | {m} |\n"
+_HTML_ROW = (
+    '        <tr>\n'
+    '            <td class="shakespeare">{s}</td>\n'
+    '            <td class="references">{r}</td>\n'
+    '            <td class="modern">{m}</td>\n'
+    '        </tr>\n'
+)
+
+# The value of each Roman numeral, indexed by its ASCII code
+_ROMAN_VALUES = [0] * 128
+for _numeral, _value in zip(b'IVXLCDM', (1, 5, 10, 50, 100, 500, 1000)):
+    _ROMAN_VALUES[_numeral] = _value
+del _numeral, _value
+
+# Fixed start and end of the HTML output, already encoded for the binary write
+_HTML_PRELUDE = b"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Translated Shakespeare Play</title>
+    <style>
+        body { font-family: 'Garamond', serif; margin: 40px; line-height: 1.6; }
+        h1 { text-align: center; margin-bottom: 40px; }
+        h2 { color: #4a4a4a; margin-top: 30px; }
+        h3 { color: #666; }
+        table { width: 100%; border-collapse: collapse; margin-bottom: 30px; }
+        th { background-color: #f2f2f2; padding: 10px; text-align: left; border-bottom: 2px solid #ddd; }
+        td { padding: 10px; border-bottom: 1px solid #ddd; vertical-align: top; }
+        .shakespeare { width: 40%; }
+        .references { width: 20%; font-size: 0.9em; color: #666; }
+        .modern { width: 40%; }
+        .separator { margin: 40px 0; border-top: 1px dashed #ccc; }
+    </style>
+</head>
+<body>
+    <h1>Translated Shakespeare Play</h1>
+"""
+_HTML_EPILOGUE = b"""</body>
+</html>"""
+
+
+class _Line(NamedTuple):
+    """One translated line, reduced to the three cells every format writes."""
+    text: str
+    formatted_references: List[str]
+    modern: str
+
+
+def _loads(data: bytes) -> Any:
+    """Parse UTF-8 JSON bytes, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 class PlayFormatter:
     """
     A dedicated formatter to convert the JSON output of translated scenes
@@ -29,68 +102,131 @@ class PlayFormatter:
         # Regular expression to extract act and scene numbers from filenames
         self.filename_pattern = re.compile(r'act_([^_]+)_scene_(\w+)\.json')
         
-    def _load_scene_files(self) -> List[Dict[str, Any]]:
+        # Sorted scene file index, built on first use and shared by the
+        # format_* methods so the directory is only scanned once
+        self._index_cache: Optional[List[Tuple[Any, Any, str, str, Path]]] = None
+        
+    def _index_scene_files(self) -> List[Tuple[Any, Any, str, str, Path]]:
         """
-        Load all scene JSON files and sort them by act and scene number.
+        Find all scene JSON files and sort them by act and scene number,
+        without loading them. The result is cached for later calls.
         
         Returns:
-            A list of tuples with (act, scene, scene_data)
+            A list of tuples with (act_key, scene_key, act, scene, filepath)
         """
+        if self._index_cache is None:
+            self._index_cache = self._scan_scene_files()
+        return self._index_cache
+    
+    def _scan_scene_files(self) -> List[Tuple[Any, Any, str, str, Path]]:
+        """List and sort the scene JSON files for _index_scene_files."""
         scene_files = []
         
-        # List all JSON files in the directory
-        for filepath in sorted(self.json_dir.glob('*.json')):
-            match = self.filename_pattern.match(filepath.name)
+        # List all JSON files in the directory, in name order
+        with os.scandir(self.json_dir) as entries:
+            names = sorted(entry.name for entry in entries if entry.name.endswith('.json'))
+            
+        for name in names:
+            match = self.filename_pattern.match(name)
             if not match:
-                print(f"Skipping file with non-matching pattern: {filepath.name}")
+                print(f"Skipping file with non-matching pattern: {name}")
                 continue
                 
             act, scene = match.groups()
-            
-            # Try to convert act and scene to numeric values for sorting
-            try:
-                # Handle Roman numerals
-                if re.match(r'^[IVXLCDM]+$', act.upper()):
-                    act_num = self._roman_to_int(act.upper())
-                else:
-                    act_num = float(act)
-                    
-                if re.match(r'^[IVXLCDM]+$', scene.upper()):
-                    scene_num = self._roman_to_int(scene.upper())
-                else:
-                    scene_num = float(scene)
-            except ValueError:
-                # If conversion fails, use string values with high sort priority
-                act_num = act
-                scene_num = scene
-            
-            # Load the scene data
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    scene_data = json.load(f)
-                    # Ensure scene_data is a dictionary
-                    if isinstance(scene_data, dict):
-                        scene_files.append((act_num, scene_num, act, scene, scene_data))
-                    else:
-                        print(f"Warning: {filepath} does not contain a valid JSON object")
-            except Exception as e:
-                print(f"Error loading {filepath}: {e}")
+            scene_files.append((self._sort_key(act), self._sort_key(scene),
+                                act, scene, self.json_dir / name))
         
         # Sort by act and scene
         scene_files.sort()
         return scene_files
     
+    def _sort_key(self, value: str) -> Tuple[int, Any]:
+        """
+        Sort key for an act or scene name from a file name.
+        
+        Decimal and Roman numbers sort by value; any other name sorts after
+        them, alphabetically.
+        """
+        if value.isdecimal():
+            return (0, int(value))
+        roman = value.upper()
+        if not roman.strip('IVXLCDM'):
+            return (0, self._roman_to_int(roman))
+        return (1, value)
+    
+    def _iter_scene_files(self) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Load the scene JSON files one at a time, in act and scene order.
+        
+        Only one scene is held here at a time, so a formatter that drops its
+        reference before asking for the next scene never has the whole play
+        in memory.
+        
+        Yields:
+            Tuples of (act, scene, scene_data)
+        """
+        for _, _, act, scene, filepath in self._index_scene_files():
+            try:
+                # Parse straight from the file's bytes, skipping the text decode
+                scene_data = _loads(filepath.read_bytes())
+            except Exception as e:
+                print(f"Error loading {filepath}: {e}")
+                continue
+                
+            # Ensure scene_data is a dictionary
+            if not isinstance(scene_data, dict):
+                print(f"Warning: {filepath} does not contain a valid JSON object")
+                continue
+                
+            self._prepare_lines(scene_data)
+            yield act, scene, scene_data
+            del scene_data
+    
+    @staticmethod
+    def _prepare_lines(scene_data: Dict[str, Any]) -> None:
+        """
+        Replace a scene's "translated_lines" with a list of _Line tuples.
+        
+        Texts that are missing or null become "", and references are
+        formatted here when a line has no pre-formatted ones, so the
+        formatters only escape and join strings. Entries that are not
+        objects are dropped, and the tuples take far less memory than the
+        parsed dicts they replace.
+        """
+        translated_lines = scene_data.get("translated_lines", [])
+        lines: List[_Line] = []
+        if isinstance(translated_lines, list):
+            for line in translated_lines:
+                if not isinstance(line, dict):
+                    continue
+                    
+                formatted_refs = line.get("formatted_references", [])
+                if not formatted_refs and "references" in line:
+                    # Format references if they haven't been pre-formatted
+                    references = line.get("references", [])
+                    if isinstance(references, list):
+                        formatted_refs = [
+                            f"{ref.get('title', 'Unknown')} ({ref.get('act', '')}.{ref.get('scene', '')}.{ref.get('line', '')})"
+                            for ref in references if isinstance(ref, dict)
+                        ]
+                
+                lines.append(_Line(
+                    line.get("text") or "",
+                    formatted_refs if isinstance(formatted_refs, list) else [],
+                    line.get("original_modern_line") or "",
+                ))
+                
+        scene_data["translated_lines"] = lines
+    
     def _roman_to_int(self, roman: str) -> int:
         """Convert Roman numeral to integer."""
-        values = {
-            'I': 1, 'V': 5, 'X': 10, 'L': 50, 
-            'C': 100, 'D': 500, 'M': 1000
-        }
+        values = _ROMAN_VALUES
         total = 0
         prev = 0
         
-        for char in reversed(roman):
-            current = values[char]
+        # Bytes iterate as ints, which index the value table directly
+        for code in reversed(roman.encode('ascii')):
+            current = values[code]
             if current >= prev:
                 total += current
             else:
@@ -111,68 +247,34 @@ class PlayFormatter:
         """
         output_path = self.output_dir / output_filename
         
-        # Load and sort scene files
-        scene_files = self._load_scene_files()
-        
-        with open(output_path, 'w', encoding='utf-8') as outfile:
-            outfile.write("# The Translated Play\n\n")
+        # Written in binary mode: each scene is encoded once as it is written
+        with open(output_path, 'wb') as outfile:
+            outfile.write(b"# The Translated Play\n\n")
             
-            for _, _, act, scene, scene_data in scene_files:
-                # Make sure scene_data is a dictionary
-                if not isinstance(scene_data, dict):
-                    continue
-                
-                # Write act and scene headers
-                outfile.write(f"## ACT {act.upper()}\n\n")
-                outfile.write(f"### SCENE {scene.upper()}\n\n")
-                
-                # Create table header
-                outfile.write("| Shakespearean Text | Source References | Modern Text |\n")
-                outfile.write("|-------------------|-------------------|------------|\n")
+            # Scenes are loaded one at a time, in act and scene order
+            for act, scene, scene_data in self._iter_scene_files():
+                # Each scene is assembled in a list and written with one call
+                parts: List[str] = [
+                    # Act and scene headers
+                    f"## ACT {act.upper()}\n\n",
+                    f"### SCENE {scene.upper()}\n\n",
+                    # Table header
+                    "| Shakespearean Text | Source References | Modern Text |\n",
+                    "|-------------------|-------------------|------------|\n",
+                ]
                 
-                # Write each line
-                translated_lines = scene_data.get("translated_lines", [])
-                if isinstance(translated_lines, list):
-                    for line in translated_lines:
-                        if not isinstance(line, dict):
-                            continue
-                            
-                        # Get the Shakespearean text
-                        shakespeare_text = line.get("text", "").replace("\n", " ")
-                        
-                        # Get the references
-                        formatted_refs = line.get("formatted_references", [])
-                        if not formatted_refs and "references" in line:
-                            # Format references if they haven't been pre-formatted
-                            references = line.get("references", [])
-                            if isinstance(references, list):
-                                formatted_refs = []
-                                for ref in references:
-                                    if isinstance(ref, dict):
-                                        source = ref.get("title", "Unknown")
-                                        act_ref = ref.get("act", "")
-                                        scene_ref = ref.get("scene", "")
-                                        line_ref = ref.get("line", "")
-                                        formatted_refs.append(f"{source} ({act_ref}.{scene_ref}.{line_ref})")
-                        
-                        if isinstance(formatted_refs, list):
-                            refs_text = "<br>".join(formatted_refs)
-                        else:
-                            refs_text = ""
-                        
-                        # Get the original modern text
-                        modern_text = line.get("original_modern_line", "").replace("\n", " ")
-                        
-                        # Escape pipe characters for markdown tables
-                        shakespeare_text = shakespeare_text.replace("|", "\\|")
-                        refs_text = refs_text.replace("|", "\\|")
-                        modern_text = modern_text.replace("|", "\\|")
-                        
-                        # Write the table row
-                        outfile.write(f"| {shakespeare_text} | {refs_text} | {modern_text} |\n")
+                for text, formatted_refs, modern in scene_data["translated_lines"]:
+                    # Shakespearean and modern text go on one line with pipes escaped
+                    parts.append(_MD_ROW.format(
+                        s=text.translate(_MD_CELL_ESCAPE),
+                        r="<br>".join(formatted_refs).translate(_MD_PIPE_ESCAPE),
+                        m=modern.translate(_MD_CELL_ESCAPE),
+                    ))
                 
                 # Add a separator between scenes
-                outfile.write("\n---\n\n")
+                parts.append("\n---\n\n")
+                outfile.write("".join(parts).encode('utf-8'))
+                del scene_data
         
         print(f"Markdown formatted play saved to: {output_path}")
         return str(output_path)
@@ -181,6 +283,9 @@ class PlayFormatter:
         """
         Format all scenes as a Word document.
         
+        The document body is streamed into the .docx file one scene at a
+        time, so only the current scene's table is held in memory.
+        
         Args:
             output_filename: Name of the output Word file
             
@@ -189,8 +294,8 @@ class PlayFormatter:
         """
         try:
             from docx import Document  # type: ignore
-            from docx.shared import Pt, Inches  # type: ignore
             from docx.enum.text import WD_ALIGN_PARAGRAPH  # type: ignore
+            from modules.output._docx_stream import StreamedDocument
         except ImportError:
             print("python-docx not installed. Install with: pip install python-docx")
             return ""
@@ -206,74 +311,99 @@ class PlayFormatter:
         title = doc.add_heading("Translated Play", level=0)
         title.alignment = WD_ALIGN_PARAGRAPH.CENTER
         
-        # Load and sort scene files
-        scene_files = self._load_scene_files()
-        
-        for _, _, act, scene, scene_data in scene_files:
-            if not isinstance(scene_data, dict):
-                continue
+        # Everything except the body is final at this point, so the
+        # document is saved as it is built: scenes are loaded one at a time,
+        # in act and scene order, and each is built in the (otherwise empty)
+        # body, written out and removed again
+        with StreamedDocument(doc, output_path) as stream:
+            table_template, row_template = self._docx_table_templates(doc)
+            for act, scene, scene_data in self._iter_scene_files():
+                self._add_docx_scene(doc, act, scene, scene_data,
+                                     table_template, row_template)
+                stream.flush()
                 
-            # Act heading
-            doc.add_heading(f"ACT {act.upper()}", level=1)
-            
-            # Scene heading
-            doc.add_heading(f"SCENE {scene.upper()}", level=2)
-            
-            # Create table
-            table = doc.add_table(rows=1, cols=3)
-            table.style = 'Table Grid'
-            
-            # Set column widths
-            for cell in table.columns[0].cells:
-                cell.width = Inches(2.5)
-            for cell in table.columns[1].cells:
-                cell.width = Inches(2.0)
-            for cell in table.columns[2].cells:
-                cell.width = Inches(2.5)
-            
-            # Header row
-            header_cells = table.rows[0].cells
-            header_cells[0].text = "Shakespearean Text"
-            header_cells[1].text = "Source References"
-            header_cells[2].text = "Modern Text"
-            
-            # Add each line to the table
-            translated_lines = scene_data.get("translated_lines", [])
-            if isinstance(translated_lines, list):
-                for line in translated_lines:
-                    if not isinstance(line, dict):
-                        continue
-                        
-                    row_cells = table.add_row().cells
-                    
-                    # Shakespearean text
-                    row_cells[0].text = line.get("text", "")
-                    
-                    # References
-                    refs = []
-                    references = line.get("references", [])
-                    if isinstance(references, list):
-                        for ref in references:
-                            if isinstance(ref, dict):
-                                source = ref.get("title", "Unknown")
-                                act_ref = ref.get("act", "")
-                                scene_ref = ref.get("scene", "")
-                                line_ref = ref.get("line", "")
-                                refs.append(f"{source} ({act_ref}.{scene_ref}.{line_ref})")
-                    
-                    row_cells[1].text = "\n".join(refs)
-                    
-                    # Modern text
-                    row_cells[2].text = line.get("original_modern_line", "")
-            
-            # Add page break between scenes
-            doc.add_page_break()
+                # Let the parsed scene be freed before the next one is loaded
+                del scene_data
         
-        # Save the document - convert Path to string
-        doc.save(str(output_path))
         print(f"Word document formatted play saved to: {output_path}")
         return str(output_path)
     
+    @staticmethod
+    def _docx_table_templates(doc: Any) -> Tuple[Any, Any]:
+        """
+        Build the scene table and line row that every scene copies.
+        
+        The table (style, column widths and header row) and the row (with
+        an empty run in each cell) are made once with python-docx and then
+        detached from the document, so each scene only deep-copies them.
+        
+        Args:
+            doc: Document to build the table in; it is left unchanged
+            
+        Returns:
+            Tuple of the <w:tbl> and <w:tr> template elements
+        """
+        from docx.shared import Inches  # type: ignore
+        from docx.oxml.ns import qn  # type: ignore
+        
+        # Create table
+        table = doc.add_table(rows=1, cols=3)
+        table.style = 'Table Grid'
+        
+        # Set column widths
+        for cell in table.columns[0].cells:
+            cell.width = Inches(2.5)
+        for cell in table.columns[1].cells:
+            cell.width = Inches(2.0)
+        for cell in table.columns[2].cells:
+            cell.width = Inches(2.5)
+        
+        # Header row
+        header_cells = table.rows[0].cells
+        header_cells[0].text = "Shakespearean Text"
+        header_cells[1].text = "Source References"
+        header_cells[2].text = "Modern Text"
+        
+        # Line row, made by add_row so the cell widths match
+        tbl = table._tbl
+        row_template = table.add_row()._tr
+        tbl.remove(row_template)
+        for paragraph in row_template.iter(qn('w:p')):
+            paragraph.add_r()
+            
+        tbl.getparent().remove(tbl)
+        return tbl, row_template
+    
+    def _add_docx_scene(self, doc: Any, act: str, scene: str, scene_data: Dict[str, Any],
+                        table_template: Any, row_template: Any) -> None:
+        """Add one scene's headings, table and trailing page break to a Word document."""
+        from docx.oxml.ns import qn  # type: ignore
+        
+        # Act heading
+        doc.add_heading(f"ACT {act.upper()}", level=1)
+        
+        # Scene heading
+        doc.add_heading(f"SCENE {scene.upper()}", level=2)
+        
+        # Copy the table with its header row
+        tbl = deepcopy(table_template)
+        doc.element.body._insert_tbl(tbl)
+        
+        # Add each line to the table. Only the run text of each copied row
+        # is set per line, and the rows are appended to the table in one go
+        rows = []
+        for text, formatted_refs, modern in scene_data["translated_lines"]:
+            tr = deepcopy(row_template)
+            texts = (text, "\n".join(formatted_refs), modern)
+            for run, cell_text in zip(tr.iter(qn('w:r')), texts):
+                # CT_R.text turns "\n" into <w:br/> like Cell.text does
+                run.text = cell_text
+            rows.append(tr)
+        tbl.extend(rows)
+        
+        # Add page break between scenes
+        doc.add_page_break()
+    
     def format_html(self, output_filename: str = "translated_play.html") -> str:
         """
         Format all scenes as an HTML document.
@@ -286,90 +416,39 @@ class PlayFormatter:
         """
         output_path = self.output_dir / output_filename
         
-        # Load and sort scene files
-        scene_files = self._load_scene_files()
-        
-        with open(output_path, 'w', encoding='utf-8') as outfile:
-            # HTML header
-            outfile.write("""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Translated Shakespeare Play</title>
-    <style>
-        body { font-family: 'Garamond', serif; margin: 40px; line-height: 1.6; }
-        h1 { text-align: center; margin-bottom: 40px; }
-        h2 { color: #4a4a4a; margin-top: 30px; }
-        h3 { color: #666; }
-        table { width: 100%; border-collapse: collapse; margin-bottom: 30px; }
-        th { background-color: #f2f2f2; padding: 10px; text-align: left; border-bottom: 2px solid #ddd; }
-        td { padding: 10px; border-bottom: 1px solid #ddd; vertical-align: top; }
-        .shakespeare { width: 40%; }
-        .references { width: 20%; font-size: 0.9em; color: #666; }
-        .modern { width: 40%; }
-        .separator { margin: 40px 0; border-top: 1px dashed #ccc; }
-    </style>
-</head>
-<body>
-    <h1>Translated Shakespeare Play</h1>
-""")
+        # Written in binary mode: each scene is encoded once as it is written
+        with open(output_path, 'wb') as outfile:
+            outfile.write(_HTML_PRELUDE)
             
-            for _, _, act, scene, scene_data in scene_files:
-                if not isinstance(scene_data, dict):
-                    continue
-                    
-                # Act and scene headers
-                outfile.write(f'    <h2>ACT {act.upper()}</h2>\n')
-                outfile.write(f'    <h3>SCENE {scene.upper()}</h3>\n')
+            # Scenes are loaded one at a time, in act and scene order
+            for act, scene, scene_data in self._iter_scene_files():
+                # Each scene is assembled in a list and written with one call
+                parts: List[str] = [
+                    # Act and scene headers
+                    f'    <h2>ACT {act.upper()}</h2>\n',
+                    f'    <h3>SCENE {scene.upper()}</h3>\n',
+                    # Table
+                    '    <table>\n'
+                    '        <tr>\n'
+                    '            <th class="shakespeare">Shakespearean Text</th>\n'
+                    '            <th class="references">Source References</th>\n'
+                    '            <th class="modern">Modern Text</th>\n'
+                    '        </tr>\n',
+                ]
                 
-                # Table
-                outfile.write('    <table>\n')
-                outfile.write('        <tr>\n')
-                outfile.write('            <th class="shakespeare">Shakespearean Text</th>\n')
-                outfile.write('            <th class="references">Source References</th>\n')
-                outfile.write('            <th class="modern">Modern Text</th>\n')
-                outfile.write('        </tr>\n')
+                for text, formatted_refs, modern in scene_data["translated_lines"]:
+                    parts.append(_HTML_ROW.format(
+                        s=text.translate(_HTML_ESCAPE),
+                        r="<br>".join(ref.translate(_HTML_ESCAPE) for ref in formatted_refs),
+                        m=modern.translate(_HTML_ESCAPE),
+                    ))
                 
-                translated_lines = scene_data.get("translated_lines", [])
-                if isinstance(translated_lines, list):
-                    for line in translated_lines:
-                        if not isinstance(line, dict):
-                            continue
-                            
-                        outfile.write('        <tr>\n')
-                        
-                        # Shakespearean text
-                        shakespeare_text = line.get("text", "").replace("<", "&lt;").replace(">", "&gt;")
-                        outfile.write(f'            <td class="shakespeare">{shakespeare_text}</td>\n')
-                        
-                        # References
-                        refs = []
-                        references = line.get("references", [])
-                        if isinstance(references, list):
-                            for ref in references:
-                                if isinstance(ref, dict):
-                                    source = ref.get("title", "Unknown").replace("<", "&lt;").replace(">", "&gt;")
-                                    act_ref = ref.get("act", "")
-                                    scene_ref = ref.get("scene", "")
-                                    line_ref = ref.get("line", "")
-                                    refs.append(f"{source} ({act_ref}.{scene_ref}.{line_ref})")
-                        
-                        refs_html = "<br>".join(refs)
-                        outfile.write(f'            <td class="references">{refs_html}</td>\n')
-                        
-                        # Modern text
-                        modern_text = line.get("original_modern_line", "").replace("<", "&lt;").replace(">", "&gt;")
-                        outfile.write(f'            <td class="modern">{modern_text}</td>\n')
-                        
-                        outfile.write('        </tr>\n')
-                
-                outfile.write('    </table>\n')
-                outfile.write('    <div class="separator"></div>\n')
+                parts.append('    </table>\n')
+                parts.append('    <div class="separator"></div>\n')
+                outfile.write("".join(parts).encode('utf-8'))
+                del scene_data
             
-            # HTML footer
-            outfile.write("""</body>
-</html>""")
+            outfile.write(_HTML_EPILOGUE)
         
         print(f"HTML formatted play saved to: {output_path}")
         return str(output_path)
@@ -388,14 +467,27 @@ def main():
     
     formatter = PlayFormatter(args.json_dir, args.output_dir)
     
+    format_methods = []
     if args.format == 'markdown' or args.format == 'all':
-        formatter.format_markdown()
+        format_methods.append(formatter.format_markdown)
     
     if args.format == 'docx' or args.format == 'all':
-        formatter.format_docx()
+        format_methods.append(formatter.format_docx)
     
     if args.format == 'html' or args.format == 'all':
-        formatter.format_html()
+        format_methods.append(formatter.format_html)
+    
+    if len(format_methods) > 1:
+        # Each format writes its own file from its own copy of each scene, so
+        # they can run side by side; build the shared scene index up front
+        formatter._index_scene_files()
+        with ThreadPoolExecutor(max_workers=len(format_methods)) as executor:
+            futures = [executor.submit(method) for method in format_methods]
+            for future in futures:
+                future.result()
+    else:
+        for method in format_methods:
+            method()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,25 +3,254 @@
 import os
 import json
 import re
-from typing import List, Dict, Any, Optional, Union, Tuple
+import importlib.util
+from copy import deepcopy
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from itertools import islice
+from typing import List, Dict, Any, Iterator, Optional, Union, Tuple
 from pathlib import Path
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 """
 This module handles saving modern play scenes and full plays to various formats.
 It supports exporting to both DOCX and Markdown formats.
 """
 
+# Act and scene names in scene file names
+_FILENAME_RE = re.compile(r'act_([^_]+)_scene_(\w+)')
+# ACT / SCENE headers: searched for anywhere in a scene's markdown, or
+# matched at the start of a line to skip the header lines
+_ACT_RE = re.compile(r'ACT\s+([IVX\d]+)', re.IGNORECASE)
+_SCENE_RE = re.compile(r'SCENE\s+([IVX\d]+)', re.IGNORECASE)
+# ACT / SCENE headers of a combined play, optionally as markdown headings;
+# one match per line tells which header it is from m.lastgroup
+_PLAY_HEADER_RE = re.compile(
+    r'(?:#+\s+)?(?:ACT\s+(?P<act>[IVX\d]+)|SCENE\s+(?P<scene>[IVX\d]+))',
+    re.IGNORECASE
+)
+# Markdown title line
+_TITLE_RE = re.compile(r'^#\s+(.+)$', re.MULTILINE)
+
+# Worker threads for reading scene files concurrently
+_LOAD_WORKERS = 8
+
+# python-docx is only imported when a document is exported (see
+# _ensure_docx_loaded); the formatting values every line reuses are built
+# there once instead of per line
+DOCX_AVAILABLE = importlib.util.find_spec("docx") is not None
+Document: Any = None
+Pt: Any = None
+RGBColor: Any = None
+WD_ALIGN_PARAGRAPH: Any = None
+OxmlElement: Any = None
+Paragraph: Any = None
+StreamedDocument: Any = None
+_DIALOGUE_INDENT: Any = None
+_STAGE_DIRECTION_COLOR: Any = None
+
+
+def _ensure_docx_loaded() -> None:
+    """Import the python-docx names this module uses into its globals, once."""
+    global Document, Pt, RGBColor, WD_ALIGN_PARAGRAPH, OxmlElement, Paragraph, StreamedDocument
+    global _DIALOGUE_INDENT, _STAGE_DIRECTION_COLOR
+    if Document is not None:
+        return
+    from docx import Document
+    from docx.shared import Pt, RGBColor
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.oxml import OxmlElement
+    from docx.text.paragraph import Paragraph
+    from modules.output._docx_stream import StreamedDocument
+    
+    _DIALOGUE_INDENT = Pt(36)
+    _STAGE_DIRECTION_COLOR = RGBColor(100, 100, 100)
+
+
+def _loads(data: bytes) -> Any:
+    """Parse UTF-8 JSON bytes, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _read_scene_file(scene_path: str) -> Tuple[Optional[Tuple[Any, Any]], List[str], Optional[Exception]]:
+    """
+    Read and parse one scene file for PlayExporter.export_play_from_scenes.
+    
+    Args:
+        scene_path: Path to a scene JSON or MD file
+        
+    Returns:
+        Tuple of (act and scene for the scene's heading, its stripped
+        non-empty script lines, the error that stopped processing). The act
+        and scene are None when the error came before they were known.
+    """
+    heading = None
+    lines: List[str] = []
+    try:
+        # Check if it's JSON or MD
+        if scene_path.lower().endswith('.json'):
+            # Load scene data
+            with open(scene_path, 'rb') as f:
+                scene_data = _loads(f.read())
+            
+            # Extract metadata
+            act = scene_data.get("act", "Unknown")
+            scene = scene_data.get("scene", "Unknown")
+            script = scene_data.get("script", "")
+            heading = (act, scene)
+            
+            # Process script content
+            for line in script.split('\n'):
+                line = line.strip()
+                if line:
+                    lines.append(line)
+        
+        else:
+            # Load markdown content
+            with open(scene_path, 'r', encoding='utf-8') as f:
+                md_content = f.read()
+            
+            # Extract act and scene from filename or content
+            act = "Unknown"
+            scene = "Unknown"
+            
+            # Try to extract from filename
+            filename = os.path.basename(scene_path)
+            match = _FILENAME_RE.search(filename)
+            if match:
+                act, scene = match.groups()
+            
+            # Try to extract from content if not found in filename
+            if act == "Unknown" or scene == "Unknown":
+                act_match = _ACT_RE.search(md_content)
+                scene_match = _SCENE_RE.search(md_content)
+                
+                if act_match:
+                    act = act_match.group(1)
+                if scene_match:
+                    scene = scene_match.group(1)
+            heading = (act, scene)
+            
+            # Process content line by line, skipping act and scene headers
+            for line in md_content.split('\n'):
+                if _ACT_RE.match(line) or _SCENE_RE.match(line):
+                    continue
+                    
+                line = line.strip()
+                if line:
+                    lines.append(line)
+                    
+    except Exception as e:
+        return heading, lines, e
+    return heading, lines, None
+
+
+def _read_scene_files(executor: Any, scene_paths: List[str]) -> Iterator[Tuple[Optional[Tuple[Any, Any]], List[str], Optional[Exception]]]:
+    """
+    Read scene files on an executor, yielding the results in order.
+    
+    At most _LOAD_WORKERS reads are submitted ahead of the scene being
+    yielded, so parsed scenes that have not been written out yet do not
+    pile up in memory.
+    
+    Args:
+        executor: Executor to read the files on
+        scene_paths: Paths to scene JSON or MD files
+        
+    Yields:
+        The result of _read_scene_file for each path
+    """
+    paths = iter(scene_paths)
+    pending = deque(executor.submit(_read_scene_file, path)
+                    for path in islice(paths, _LOAD_WORKERS))
+    while pending:
+        scene = pending.popleft().result()
+        # Start the next read before handing this scene over
+        for path in islice(paths, 1):
+            pending.append(executor.submit(_read_scene_file, path))
+        yield scene
+
+
+class _ScriptLineWriter:
+    """
+    Adds script lines to one document: stage directions in italics (grey if
+    asked), character names in bold and everything else as indented dialogue.
+    
+    Each line is a copy of a paragraph built once per kind, inserted right
+    before the body's section properties. Document.add_paragraph searches
+    the body for that position on every call, which makes long scripts
+    quadratic to add.
+    """
+    
+    def __init__(self, doc: Any, grey_stage_directions: bool = False):
+        """
+        Build the paragraph templates for a document.
+        
+        Args:
+            doc: Document the lines are added to
+            grey_stage_directions: Whether stage directions are grey
+        """
+        # Stage direction: italic run
+        stage_direction = Paragraph(OxmlElement('w:p'), doc)
+        run = stage_direction.add_run()
+        run.italic = True
+        if grey_stage_directions:
+            run.font.color.rgb = _STAGE_DIRECTION_COLOR
+        
+        # Character name: bold run
+        character_name = Paragraph(OxmlElement('w:p'), doc)
+        character_name.add_run().bold = True
+        
+        # Regular dialogue: plain run in an indented paragraph
+        dialogue = Paragraph(OxmlElement('w:p'), doc)
+        dialogue.add_run()
+        dialogue.paragraph_format.left_indent = _DIALOGUE_INDENT  # Indent dialogue
+        
+        self._stage_direction = stage_direction._p
+        self._character_name = character_name._p
+        self._dialogue = dialogue._p
+        self._body = doc.element.body
+        self._sect_pr = self._body.sectPr
+    
+    def add_line(self, line: str) -> None:
+        """Add one stripped, non-empty script line to the document."""
+        # Check if it's a stage direction [...]
+        if line.startswith('[') and line.endswith(']'):
+            p = deepcopy(self._stage_direction)
+        # Check if it's a character name (all caps and at most three words).
+        # isupper() goes first: it stops at the first lowercase letter, so
+        # dialogue is rejected after a character or two, and the split that
+        # counts words (stopping after the fourth) only runs on capitals
+        elif line.isupper() and len(line.split(None, 3)) <= 3:
+            p = deepcopy(self._character_name)
+        # Regular dialogue
+        else:
+            p = deepcopy(self._dialogue)
+            
+        # CT_R.text turns tabs and newlines into <w:tab/> and <w:br/> like add_run does
+        p.r_lst[0].text = line
+        if self._sect_pr is not None:
+            self._sect_pr.addprevious(p)
+        else:
+            self._body.append(p)
+
+
 class SceneExporter:
     """Handles exporting individual scenes to various formats."""
     
     def __init__(self):
         """Initialize the SceneExporter."""
         # Check if python-docx is available
-        try:
-            import docx
-            self.docx_available = True
-        except ImportError:
-            self.docx_available = False
+        self.docx_available = DOCX_AVAILABLE
+        if not self.docx_available:
             print("Warning: python-docx not available. Install with: pip install python-docx")
     
     def export_scene_from_json(self, json_path: str, output_path: str) -> str:
@@ -40,8 +269,8 @@ class SceneExporter:
         
         # Load the scene data
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                scene_data = json.load(f)
+            with open(json_path, 'rb') as f:
+                scene_data = _loads(f.read())
         except Exception as e:
             raise ValueError(f"Error loading scene JSON: {str(e)}")
         
@@ -51,9 +280,7 @@ class SceneExporter:
         script = scene_data.get("script", "")
         
         # Create DOCX
-        from docx import Document
-        from docx.shared import Pt, RGBColor
-        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        _ensure_docx_loaded()
         
         doc = Document()
         
@@ -65,30 +292,13 @@ class SceneExporter:
         lines = script.split('\n')
         
         # Add content
+        writer = _ScriptLineWriter(doc, grey_stage_directions=True)
         for line in lines:
             line = line.strip()
             if not line:
                 continue
                 
-            # Check if it's a stage direction [...]
-            if line.startswith('[') and line.endswith(']'):
-                p = doc.add_paragraph()
-                run = p.add_run(line)
-                run.italic = True
-                run.font.color.rgb = RGBColor(100, 100, 100)
-                continue
-                
-            # Check if it's a character name (all caps)
-            if line.isupper() and len(line.split()) <= 3:
-                p = doc.add_paragraph()
-                run = p.add_run(line)
-                run.bold = True
-                p.space_after = Pt(0)  # No space after character name
-                continue
-                
-            # Regular dialogue
-            p = doc.add_paragraph(line)
-            p.paragraph_format.left_indent = Pt(36)  # Indent dialogue
+            writer.add_line(line)
         
         # Save the document
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -123,15 +333,15 @@ class SceneExporter:
         
         # Try to extract from filename
         filename = os.path.basename(md_path)
-        match = re.search(r'act_([^_]+)_scene_(\w+)', filename)
+        match = _FILENAME_RE.search(filename)
         if match:
             act, scene = match.groups()
         
         # Try to extract from content if not found in filename
         if act == "Unknown" or scene == "Unknown":
             # Look for ACT and SCENE headers in the content
-            act_match = re.search(r'ACT\s+([IVX\d]+)', md_content, re.IGNORECASE)
-            scene_match = re.search(r'SCENE\s+([IVX\d]+)', md_content, re.IGNORECASE)
+            act_match = _ACT_RE.search(md_content)
+            scene_match = _SCENE_RE.search(md_content)
             
             if act_match:
                 act = act_match.group(1)
@@ -139,9 +349,7 @@ class SceneExporter:
                 scene = scene_match.group(1)
         
         # Create DOCX
-        from docx import Document
-        from docx.shared import Pt, RGBColor
-        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        _ensure_docx_loaded()
         
         doc = Document()
         
@@ -149,43 +357,17 @@ class SceneExporter:
         title = doc.add_heading(f"Act {act}, Scene {scene}", level=1)
         title.alignment = WD_ALIGN_PARAGRAPH.CENTER
         
-        # Process the markdown content - split by lines
-        lines = md_content.split('\n')
-        
-        # Skip act and scene headers
-        content_lines = []
-        for line in lines:
-            if re.match(r'^ACT\s+[IVX\d]+', line, re.IGNORECASE):
-                continue
-            if re.match(r'^SCENE\s+[IVX\d]+', line, re.IGNORECASE):
+        # Add content line by line, skipping act and scene headers
+        writer = _ScriptLineWriter(doc, grey_stage_directions=True)
+        for line in md_content.split('\n'):
+            if _ACT_RE.match(line) or _SCENE_RE.match(line):
                 continue
-            content_lines.append(line)
-        
-        # Add content
-        for line in content_lines:
+                
             line = line.strip()
             if not line:
                 continue
                 
-            # Check if it's a stage direction [...]
-            if line.startswith('[') and line.endswith(']'):
-                p = doc.add_paragraph()
-                run = p.add_run(line)
-                run.italic = True
-                run.font.color.rgb = RGBColor(100, 100, 100)
-                continue
-                
-            # Check if it's a character name (all caps)
-            if line.isupper() and len(line.split()) <= 3:
-                p = doc.add_paragraph()
-                run = p.add_run(line)
-                run.bold = True
-                p.space_after = Pt(0)  # No space after character name
-                continue
-                
-            # Regular dialogue
-            p = doc.add_paragraph(line)
-            p.paragraph_format.left_indent = Pt(36)  # Indent dialogue
+            writer.add_line(line)
         
         # Save the document
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -200,11 +382,8 @@ class PlayExporter:
     def __init__(self):
         """Initialize the PlayExporter."""
         # Check if python-docx is available
-        try:
-            import docx
-            self.docx_available = True
-        except ImportError:
-            self.docx_available = False
+        self.docx_available = DOCX_AVAILABLE
+        if not self.docx_available:
             print("Warning: python-docx not available. Install with: pip install python-docx")
         
         # Create a scene exporter for individual scenes
@@ -226,9 +405,7 @@ class PlayExporter:
             raise ImportError("python-docx is required for DOCX export")
         
         # Create DOCX
-        from docx import Document
-        from docx.shared import Pt, Inches
-        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        _ensure_docx_loaded()
         
         doc = Document()
         
@@ -239,128 +416,41 @@ class PlayExporter:
         # Add break for title page
         doc.add_page_break()
         
-        # Process each scene
-        for scene_path in scene_paths:
-            # Check if it's JSON or MD
-            is_json = scene_path.lower().endswith('.json')
+        writer = _ScriptLineWriter(doc)
+        
+        # The document is saved as it is built: each scene is written out
+        # once it is complete
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with ExitStack() as stack:
+            # Scene files are independent, so read and parse them
+            # concurrently, a few scenes ahead of the one being built
+            if len(scene_paths) > 1:
+                executor = stack.enter_context(
+                    ThreadPoolExecutor(max_workers=min(_LOAD_WORKERS, len(scene_paths))))
+                scenes = _read_scene_files(executor, scene_paths)
+            else:
+                scenes = map(_read_scene_file, scene_paths)
+            stream = stack.enter_context(StreamedDocument(doc, output_path))
             
-            try:
-                if is_json:
-                    # Load scene data
-                    with open(scene_path, 'r', encoding='utf-8') as f:
-                        scene_data = json.load(f)
-                    
-                    # Extract metadata
-                    act = scene_data.get("act", "Unknown")
-                    scene = scene_data.get("scene", "Unknown")
-                    script = scene_data.get("script", "")
-                    
-                    # Add scene header
+            # Process each scene, in order
+            for scene_path, (heading, lines, error) in zip(scene_paths, scenes):
+                # Add scene header
+                if heading is not None:
+                    act, scene = heading
                     doc.add_heading(f"Act {act}, Scene {scene}", level=1)
-                    
-                    # Process script content
-                    lines = script.split('\n')
-                    
-                    # Add content
-                    for line in lines:
-                        line = line.strip()
-                        if not line:
-                            continue
-                            
-                        # Check if it's a stage direction [...]
-                        if line.startswith('[') and line.endswith(']'):
-                            p = doc.add_paragraph()
-                            run = p.add_run(line)
-                            run.italic = True
-                            continue
-                            
-                        # Check if it's a character name (all caps)
-                        if line.isupper() and len(line.split()) <= 3:
-                            p = doc.add_paragraph()
-                            run = p.add_run(line)
-                            run.bold = True
-                            p.space_after = Pt(0)  # No space after character name
-                            continue
-                            
-                        # Regular dialogue
-                        p = doc.add_paragraph(line)
-                        p.paragraph_format.left_indent = Pt(36)  # Indent dialogue
                 
+                # Add content
+                for line in lines:
+                    writer.add_line(line)
+                
+                if error is None:
+                    # Add page break after each scene
+                    doc.add_page_break()
                 else:
-                    # Load markdown content
-                    with open(scene_path, 'r', encoding='utf-8') as f:
-                        md_content = f.read()
+                    print(f"Error processing scene {scene_path}: {str(error)}")
+                    # Continue with next scene
                     
-                    # Extract act and scene from filename or content
-                    act = "Unknown"
-                    scene = "Unknown"
-                    
-                    # Try to extract from filename
-                    filename = os.path.basename(scene_path)
-                    match = re.search(r'act_([^_]+)_scene_(\w+)', filename)
-                    if match:
-                        act, scene = match.groups()
-                    
-                    # Try to extract from content if not found in filename
-                    if act == "Unknown" or scene == "Unknown":
-                        act_match = re.search(r'ACT\s+([IVX\d]+)', md_content, re.IGNORECASE)
-                        scene_match = re.search(r'SCENE\s+([IVX\d]+)', md_content, re.IGNORECASE)
-                        
-                        if act_match:
-                            act = act_match.group(1)
-                        if scene_match:
-                            scene = scene_match.group(1)
-                    
-                    # Add scene header
-                    doc.add_heading(f"Act {act}, Scene {scene}", level=1)
-                    
-                    # Process markdown content
-                    lines = md_content.split('\n')
-                    
-                    # Skip act and scene headers
-                    content_lines = []
-                    for line in lines:
-                        if re.match(r'^ACT\s+[IVX\d]+', line, re.IGNORECASE):
-                            continue
-                        if re.match(r'^SCENE\s+[IVX\d]+', line, re.IGNORECASE):
-                            continue
-                        content_lines.append(line)
-                    
-                    # Add content
-                    for line in content_lines:
-                        line = line.strip()
-                        if not line:
-                            continue
-                            
-                        # Check if it's a stage direction [...]
-                        if line.startswith('[') and line.endswith(']'):
-                            p = doc.add_paragraph()
-                            run = p.add_run(line)
-                            run.italic = True
-                            continue
-                            
-                        # Check if it's a character name (all caps)
-                        if line.isupper() and len(line.split()) <= 3:
-                            p = doc.add_paragraph()
-                            run = p.add_run(line)
-                            run.bold = True
-                            p.space_after = Pt(0)  # No space after character name
-                            continue
-                            
-                        # Regular dialogue
-                        p = doc.add_paragraph(line)
-                        p.paragraph_format.left_indent = Pt(36)  # Indent dialogue
-                
-                # Add page break after each scene
-                doc.add_page_break()
-                
-            except Exception as e:
-                print(f"Error processing scene {scene_path}: {str(e)}")
-                # Continue with next scene
-        
-        # Save the document
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        doc.save(output_path)
+                stream.flush()
         
         return output_path
 
@@ -386,13 +476,11 @@ class PlayExporter:
             raise ValueError(f"Error loading markdown file: {str(e)}")
         
         # Extract play title (if present)
-        title_match = re.search(r'^#\s+(.+)$', md_content, re.MULTILINE)
+        title_match = _TITLE_RE.search(md_content)
         title = title_match.group(1) if title_match else "Play"
         
         # Create DOCX
-        from docx import Document
-        from docx.shared import Pt
-        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        _ensure_docx_loaded()
         
         doc = Document()
         
@@ -411,70 +499,45 @@ class PlayExporter:
         # Split content into lines and process
         lines = md_content.split('\n')
         
-        for i, line in enumerate(lines):
-            # Skip the title line we already processed
-            if i == 0 and title_match and title_match.group(0) == line:
-                continue
-                
-            # Check for Act header
-            act_match = re.match(r'^(?:#+\s+)?ACT\s+([IVX\d]+)', line, re.IGNORECASE)
-            if act_match:
-                # When we find a new act, add the previous scene's content
-                if dialogue_buffer:
-                    self._add_dialogue_to_doc(doc, dialogue_buffer)
-                    dialogue_buffer = []
-                
-                current_act = act_match.group(1)
-                doc.add_heading(f"Act {current_act}", level=1)
-                continue
-                
-            # Check for Scene header
-            scene_match = re.match(r'^(?:#+\s+)?SCENE\s+([IVX\d]+)', line, re.IGNORECASE)
-            if scene_match:
-                # When we find a new scene, add the previous scene's content
-                if dialogue_buffer:
-                    self._add_dialogue_to_doc(doc, dialogue_buffer)
-                    dialogue_buffer = []
-                
-                current_scene = scene_match.group(1)
-                doc.add_heading(f"Scene {current_scene}", level=2)
-                continue
-                
-            # Add other content to the dialogue buffer
-            line = line.strip()
-            if line:
-                dialogue_buffer.append(line)
-        
-        # Add any remaining content
-        if dialogue_buffer:
-            self._add_dialogue_to_doc(doc, dialogue_buffer)
-        
-        # Save the document
+        # The document is saved as it is built: each section is written out
+        # once the next header is reached
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        doc.save(output_path)
+        with StreamedDocument(doc, output_path) as stream:
+            for i, line in enumerate(lines):
+                # Skip the title line we already processed
+                if i == 0 and title_match and title_match.group(0) == line:
+                    continue
+                    
+                # Check for an Act or Scene header
+                header_match = _PLAY_HEADER_RE.match(line)
+                if header_match:
+                    # When we find a new act or scene, add the previous scene's content
+                    if dialogue_buffer:
+                        self._add_dialogue_to_doc(doc, dialogue_buffer)
+                        dialogue_buffer = []
+                    stream.flush()
+                    
+                    if header_match.lastgroup == 'act':
+                        current_act = header_match.group('act')
+                        doc.add_heading(f"Act {current_act}", level=1)
+                    else:
+                        current_scene = header_match.group('scene')
+                        doc.add_heading(f"Scene {current_scene}", level=2)
+                    continue
+                    
+                # Add other content to the dialogue buffer
+                line = line.strip()
+                if line:
+                    dialogue_buffer.append(line)
+            
+            # Add any remaining content
+            if dialogue_buffer:
+                self._add_dialogue_to_doc(doc, dialogue_buffer)
         
         return output_path
 
     def _add_dialogue_to_doc(self, doc, lines):
         """Helper method to add dialogue lines to document with proper formatting."""
-        from docx.shared import Pt
-        
+        writer = _ScriptLineWriter(doc)
         for line in lines:
-            # Check if it's a stage direction [...]
-            if line.startswith('[') and line.endswith(']'):
-                p = doc.add_paragraph()
-                run = p.add_run(line)
-                run.italic = True
-                continue
-                
-            # Check if it's a character name (all caps)
-            if line.isupper() and len(line.split()) <= 3:
-                p = doc.add_paragraph()
-                run = p.add_run(line)
-                run.bold = True
-                p.space_after = Pt(0)  # No space after character name
-                continue
-                
-            # Regular dialogue
-            p = doc.add_paragraph(line)
-            p.paragraph_format.left_indent = Pt(36)  # Indent dialogue
\ No newline at end of file
+            writer.add_line(line)
\ No newline at end of file
@@ -66,4 +66,11 @@ class CustomLogger:
 
     def debug(self, message: str) -> None:
         """Log a debug message."""
-        self.logger.debug(message)
\ No newline at end of file
+        self.logger.debug(message)
+
+    def is_debug_enabled(self) -> bool:
+        """Return True if debug messages would be emitted.
+
+        Lets hot loops skip building debug strings when debug logging is off.
+        """
+        return self.logger.isEnabledFor(logging.DEBUG)